@@ -1,7 +1,10 @@
 import numpy as np
-import cv2
 import concurrent.futures
 
+from utils.lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+
 class ZeusNodeGraph:
     """
     Represents a Zeus network Zeus node graph.
@@ -37,16 +40,22 @@ class ZeusNodeGraph:
         for edge in self.edges:
             cv2.line(image, edge.source.position, edge.destination.position, edge.color, thickness=2)
 
-    def compute(self, image):
+    def compute(self, image, router=None):
         """
         Computes the general purpose vision compute on the Zeus network Zeus node graph.
 
         Args:
             image (numpy.ndarray): The image to compute the general purpose vision compute on.
+            router (TaskRouter): Route node and edge computations through a load-aware
+                router instead of a local thread pool.
 
         Returns:
             dict: A dictionary containing the general purpose vision compute results.
         """
+        if router is not None:
+            futures = {item.id: router.submit(item, image) for item in self.nodes + self.edges}
+            return {item_id: future.result() for item_id, future in futures.items()}
+
         results = {}
 
         with concurrent.futures.ThreadPoolExecutor() as executor:
@@ -66,6 +75,19 @@ class ZeusNodeGraph:
 
         return results
 
+    def compute_stream(self, source):
+        """
+        Computes the general purpose vision compute on every frame of a video source.
+
+        Args:
+            source (VideoSource): The video source to read frames from.
+
+        Yields:
+            dict: A dictionary containing the general purpose vision compute results of each frame.
+        """
+        for frame in source:
+            yield self.compute(frame)
+
 
 class ZeusNode:
     """
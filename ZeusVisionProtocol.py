@@ -51,7 +51,6 @@ def example_usage():
 # Step 8: Iterate and Improve
 # Continuously iterate on the protocol, library, and integration examples based on feedback and emerging needs.
 
-```
 
 #In the updated code, we define the `ZeusVisionProtocol` class as the core protocol for vision tasks. We then implement the `MyVisionLibrary` class, which encapsulates the integration of the protocol within a specific vision library. The `process_image` method of `MyVisionLibrary` handles the conversion of the image to the protocol's format, utilizes the protocol's `process_image` method, and converts the result back to the library-specific format.
 
@@ -0,0 +1,76 @@
+import importlib
+import threading
+
+# Adapters are registered as "module:attribute" paths so that listing them
+# never imports the module or the vision library behind it.
+_ADAPTERS = {
+    'opencv': 'zeuslightingadapter:OpenCVAdapter',
+    'scikit-image': 'zeuslightingadapter:ScikitImageAdapter',
+}
+_LOADED = {}
+_LOCK = threading.Lock()
+
+
+def register_adapter(name, target):
+    """
+    Register a ZeusProtocol adapter under a name.
+
+    Args:
+        name (str): The name to look the adapter up by.
+        target (str or type): A "module:attribute" path to the adapter class, or the class itself.
+    """
+    with _LOCK:
+        _ADAPTERS[name] = target
+        _LOADED.pop(name, None)
+
+
+def available_adapters():
+    """
+    List the registered adapter names without importing any of them.
+
+    Returns:
+        List[str]: The registered adapter names.
+    """
+    with _LOCK:
+        return sorted(_ADAPTERS)
+
+
+def get_adapter_class(name):
+    """
+    Resolve a registered adapter class, importing its module on first use.
+
+    Args:
+        name (str): The registered adapter name.
+
+    Returns:
+        type: The adapter class.
+    """
+    with _LOCK:
+        if name in _LOADED:
+            return _LOADED[name]
+        if name not in _ADAPTERS:
+            raise KeyError(f"Unknown adapter {name!r}. Available adapters: {', '.join(sorted(_ADAPTERS))}.")
+        target = _ADAPTERS[name]
+
+    if isinstance(target, str):
+        module_name, _, attribute = target.partition(':')
+        target = getattr(importlib.import_module(module_name), attribute)
+
+    with _LOCK:
+        _LOADED[name] = target
+    return target
+
+
+def create_adapter(name, *args, **kwargs):
+    """
+    Instantiate a registered adapter by name.
+
+    Args:
+        name (str): The registered adapter name.
+        *args: Positional arguments for the adapter constructor.
+        **kwargs: Keyword arguments for the adapter constructor.
+
+    Returns:
+        ZeusProtocol: The adapter instance.
+    """
+    return get_adapter_class(name)(*args, **kwargs)
@@ -0,0 +1,221 @@
+import threading
+
+from utils.lazy_import import lazy_import
+
+torch = lazy_import('torch')
+vision_trainer = lazy_import('vision_trainer')
+
+
+class CascadeClassifier:
+    """
+    Early-exit inference across a cascade of increasingly expensive models.
+
+    Every sample goes through the cheapest model first. Samples whose top softmax
+    confidence reaches the stage threshold exit there; the rest are gathered into
+    one batch and escalated to the next, deeper model. The last stage accepts
+    whatever reaches it.
+    """
+
+    def __init__(self, stages, thresholds=None):
+        """
+        Initializes a cascade classifier.
+
+        Args:
+            stages (list): The models, from cheapest to most expensive. They must share
+                the same output classes.
+            thresholds (list): The confidence each stage but the last needs for a sample
+                to exit. Defaults to 0.9 for every stage.
+        """
+        if not stages:
+            raise ValueError("A cascade needs at least one stage.")
+        if thresholds is None:
+            thresholds = [0.9] * (len(stages) - 1)
+        if len(thresholds) != len(stages) - 1:
+            raise ValueError("Expected one threshold per stage except the last.")
+
+        self.stages = list(stages)
+        self.thresholds = list(thresholds)
+        self._registry = None
+        self._acquired = []
+        self._entered = [0] * len(self.stages)
+        self._exited = [0] * len(self.stages)
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @classmethod
+    def from_depths(cls, depths, num_classes, thresholds=None, registry=None, weights_paths=None):
+        """
+        Build a cascade of ResNetModels from shared registry instances.
+
+        The cascade holds a registry reference to each stage until `close` is called.
+
+        Args:
+            depths (list): The ResNet depths, from shallowest to deepest, e.g. [18, 50, 152].
+            num_classes (int): The number of output classes.
+            thresholds (list): The exit confidence of each stage but the last.
+            registry (ModelRegistry): The registry to acquire models from. Defaults to
+                the process-wide registry.
+            weights_paths (list): An optional weights file per depth.
+
+        Returns:
+            CascadeClassifier: The cascade.
+        """
+        if registry is None:
+            from model_registry import default_registry as registry
+
+        weights_paths = weights_paths or [None] * len(depths)
+        stages = []
+        try:
+            for depth, weights_path in zip(depths, weights_paths):
+                stages.append(registry.acquire_resnet(depth, num_classes, weights_path))
+            cascade = cls(stages, thresholds)
+        except BaseException:
+            for model in stages:
+                registry.release(model)
+            raise
+
+        cascade._registry = registry
+        cascade._acquired = stages
+        return cascade
+
+    def close(self):
+        """
+        Release the stages acquired from a registry by `from_depths`.
+        """
+        registry, acquired = self._registry, self._acquired
+        self._registry, self._acquired = None, []
+        for model in acquired:
+            registry.release(model)
+
+    def predict(self, images):
+        """
+        Classify a batch of images, escalating low-confidence samples.
+
+        Args:
+            images (torch.Tensor): The input batch.
+
+        Returns:
+            tuple: The predicted classes, their confidences, and the index of the stage
+            each sample exited at.
+        """
+        count = images.size(0)
+        predictions = torch.empty(count, dtype=torch.long)
+        confidences = torch.empty(count)
+        exit_stages = torch.empty(count, dtype=torch.long)
+        remaining = torch.arange(count)
+        entered = [0] * len(self.stages)
+        exited = [0] * len(self.stages)
+
+        with torch.no_grad():
+            for index, model in enumerate(self.stages):
+                if remaining.numel() == 0:
+                    break
+
+                device = next(model.parameters()).device
+                batch = images.index_select(0, remaining.to(images.device)).to(device)
+                stage_confidences, stage_predictions = torch.softmax(model(batch), dim=1).max(dim=1)
+                stage_confidences = stage_confidences.cpu()
+                stage_predictions = stage_predictions.cpu()
+
+                if index == len(self.stages) - 1:
+                    accepted = torch.ones_like(stage_confidences, dtype=torch.bool)
+                else:
+                    accepted = stage_confidences >= self.thresholds[index]
+
+                exiting = remaining[accepted]
+                predictions[exiting] = stage_predictions[accepted]
+                confidences[exiting] = stage_confidences[accepted]
+                exit_stages[exiting] = index
+
+                entered[index] = remaining.numel()
+                exited[index] = exiting.numel()
+                remaining = remaining[~accepted]
+
+        with self._lock:
+            for index in range(len(self.stages)):
+                self._entered[index] += entered[index]
+                self._exited[index] += exited[index]
+
+        return predictions, confidences, exit_stages
+
+    def calibrate(self, validation_dataset, batch_size=64, target_accuracy=None):
+        """
+        Set each stage's threshold from its confidences on a validation set.
+
+        Each stage but the last is evaluated with VisionTrainer.test on the device it
+        already lives on, so shared models are never moved, and its threshold
+        is set to the lowest confidence at which the samples it would accept are still
+        at least `target_accuracy` accurate. Stages are calibrated independently on the
+        full validation set.
+
+        Args:
+            validation_dataset (Dataset): The labelled validation samples.
+            batch_size (int): The evaluation batch size.
+            target_accuracy (float): The accuracy in percent that accepted samples must
+                reach. Defaults to the accuracy of the last stage.
+
+        Returns:
+            List[float]: The calibrated thresholds.
+        """
+        def evaluate(model):
+            device = next(model.parameters()).device
+            trainer = vision_trainer.VisionTrainer(
+                model, None, validation_dataset, batch_size, learning_rate=0.0, device=device
+            )
+            return trainer.test(return_predictions=True)
+
+        if target_accuracy is None:
+            target_accuracy, _, _, _ = evaluate(self.stages[-1])
+
+        thresholds = []
+        for model in self.stages[:-1]:
+            _, stage_confidences, stage_predictions, labels = evaluate(model)
+
+            order = torch.argsort(stage_confidences, descending=True)
+            correct = (stage_predictions[order] == labels[order]).float()
+            accepted_accuracy = correct.cumsum(0) / torch.arange(1, correct.numel() + 1) * 100
+
+            reaching = torch.nonzero(accepted_accuracy >= target_accuracy).flatten()
+            if reaching.numel() == 0:
+                # Nothing this stage says is accurate enough; escalate everything
+                thresholds.append(float('inf'))
+            else:
+                thresholds.append(stage_confidences[order][reaching[-1]].item())
+
+        self.thresholds = thresholds
+        return thresholds
+
+    def stats(self):
+        """
+        Report how many samples entered and exited each stage.
+
+        Returns:
+            List[dict]: Per-stage counts, the hit rate among samples reaching the stage,
+            and the share of all samples that exited there.
+        """
+        with self._lock:
+            total = self._entered[0]
+            return [
+                {
+                    'stage': index,
+                    'threshold': self.thresholds[index] if index < len(self.thresholds) else None,
+                    'entered': self._entered[index],
+                    'exited': self._exited[index],
+                    'hit_rate': self._exited[index] / self._entered[index] if self._entered[index] else 0.0,
+                    'share': self._exited[index] / total if total else 0.0,
+                }
+                for index in range(len(self.stages))
+            ]
+
+    def reset_stats(self):
+        """
+        Clear the per-stage counters.
+        """
+        with self._lock:
+            self._entered = [0] * len(self.stages)
+            self._exited = [0] * len(self.stages)
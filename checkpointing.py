@@ -0,0 +1,295 @@
+import glob
+import os
+import tempfile
+import threading
+import time
+
+from utils.lazy_import import lazy_import
+
+torch = lazy_import('torch')
+
+
+def snapshot_to_cpu(state):
+    """
+    Copy every tensor in a (nested) state dict to CPU memory.
+
+    The copy decouples the snapshot from the live parameters, so training can keep
+    updating them while the snapshot is serialized in the background.
+
+    Args:
+        state (object): A state dict, or a list, tuple or value nested inside one.
+
+    Returns:
+        object: The same structure with every tensor copied to CPU.
+    """
+    if torch.is_tensor(state):
+        return state.detach().to('cpu', copy=True)
+    if isinstance(state, dict):
+        return {key: snapshot_to_cpu(value) for key, value in state.items()}
+    if isinstance(state, (list, tuple)):
+        return type(state)(snapshot_to_cpu(value) for value in state)
+    return state
+
+
+class CheckpointManager:
+    """
+    Writes training checkpoints on a background thread.
+
+    A checkpoint is snapshotted to CPU memory on the training thread, then
+    serialized by a writer thread to a temporary file that is atomically renamed
+    into place. Only the last `keep_last` checkpoints are kept. If a new snapshot
+    arrives before the writer has started on the previous one, the older snapshot
+    is skipped so training never waits on disk I/O.
+
+    Checkpoints are ordered by step across the whole directory, so a directory
+    must only hold one run. Resuming a run from its directory is fine, but the
+    first save of a run fails if the directory already holds a checkpoint at the
+    same or a later step, e.g. from a previous, longer run, unless the run was
+    resumed with `mark`.
+    """
+
+    def __init__(self, directory, keep_last=3, every_steps=None, every_seconds=None):
+        """
+        Initializes a checkpoint manager.
+
+        Args:
+            directory (str): The directory to write checkpoints to.
+            keep_last (int): The number of most recent checkpoints to keep, at least 1.
+            every_steps (int): Checkpoint every `every_steps` optimizer steps.
+            every_seconds (float): Checkpoint when `every_seconds` have passed since the last one.
+        """
+        if keep_last < 1:
+            raise ValueError("keep_last must be at least 1.")
+
+        self.directory = directory
+        self.keep_last = keep_last
+        self.every_steps = every_steps
+        self.every_seconds = every_seconds
+        self.written = 0
+        self.skipped = 0
+
+        self._last_step = 0
+        self._last_time = time.monotonic()
+        self._checked = False
+        self._pending = None
+        self._writing = False
+        self._error = None
+        self._closed = False
+        self._condition = threading.Condition()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def due(self, step):
+        """
+        Check whether a checkpoint is due at the given step.
+
+        Args:
+            step (int): The global optimizer step.
+
+        Returns:
+            bool: True if a step or time interval has elapsed.
+        """
+        if self.every_steps and step - self._last_step >= self.every_steps:
+            return True
+        if self.every_seconds and time.monotonic() - self._last_time >= self.every_seconds:
+            return True
+        return False
+
+    def mark(self, step):
+        """
+        Restart the checkpoint intervals from the given step, e.g. after resuming.
+
+        Args:
+            step (int): The global optimizer step.
+        """
+        self._last_step = step
+        self._last_time = time.monotonic()
+        # Continuing a run from this directory, so its checkpoints are this run's own
+        self._checked = True
+
+    def maybe_save(self, step, model, optimizer, **metadata):
+        """
+        Save a checkpoint if one is due at the given step.
+
+        Args:
+            step (int): The global optimizer step.
+            model (nn.Module): The model to checkpoint.
+            optimizer (optim.Optimizer): The optimizer to checkpoint.
+            **metadata: Extra resumable state, e.g. the epoch and batch index.
+
+        Returns:
+            bool: True if a checkpoint was scheduled.
+        """
+        if not self.due(step):
+            return False
+        self.save(step, model, optimizer, **metadata)
+        return True
+
+    def save(self, step, model, optimizer, **metadata):
+        """
+        Snapshot the training state and schedule it to be written.
+
+        Args:
+            step (int): The global optimizer step.
+            model (nn.Module): The model to checkpoint.
+            optimizer (optim.Optimizer): The optimizer to checkpoint.
+            **metadata: Extra resumable state, e.g. the epoch and batch index.
+
+        Raises:
+            ValueError: On the first save of a run that was not resumed, if the
+                directory already holds a checkpoint at the same or a later step.
+        """
+        self._raise_error()
+
+        if not self._checked:
+            # Rotation and `latest` order by step, so an older run's later checkpoints
+            # would delete this run's checkpoints and be resumed instead of them
+            stale = [path for path in self.checkpoints() if self._step_of(path) >= step]
+            if stale:
+                raise ValueError(
+                    f"{self.directory!r} already holds a checkpoint at step {self._step_of(stale[-1])}; "
+                    "resume from it or write this run to a fresh directory."
+                )
+
+        checkpoint = {
+            'step': step,
+            'model': snapshot_to_cpu(model.state_dict()),
+            'optimizer': snapshot_to_cpu(optimizer.state_dict()),
+            'rng_state': torch.get_rng_state(),
+        }
+        checkpoint.update(metadata)
+
+        with self._condition:
+            if self._pending is not None:
+                self.skipped += 1
+            self._pending = checkpoint
+            self._condition.notify_all()
+
+        self.mark(step)
+
+    def wait(self):
+        """
+        Block until every scheduled checkpoint has been written.
+        """
+        with self._condition:
+            while self._pending is not None or self._writing:
+                self._condition.wait()
+        self._raise_error()
+
+    def close(self):
+        """
+        Write any scheduled checkpoint and stop the writer thread.
+        """
+        self.wait()
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._writer.join()
+
+    def checkpoints(self):
+        """
+        List the checkpoints on disk, oldest first.
+
+        Returns:
+            List[str]: The checkpoint paths.
+        """
+        return sorted(glob.glob(os.path.join(self.directory, 'checkpoint-*.pt')))
+
+    def latest(self):
+        """
+        Find the most recent checkpoint on disk.
+
+        Returns:
+            str: The checkpoint path, or None if there is none.
+        """
+        checkpoints = self.checkpoints()
+        return checkpoints[-1] if checkpoints else None
+
+    def load(self, path=None):
+        """
+        Load a checkpoint.
+
+        Args:
+            path (str): The checkpoint to load. Defaults to the most recent one.
+
+        Returns:
+            dict: The checkpoint, or None if there is none.
+        """
+        path = path or self.latest()
+        if path is None:
+            return None
+        return torch.load(path, map_location='cpu')
+
+    @staticmethod
+    def _step_of(path):
+        """
+        Parse the step from a checkpoint file name.
+        """
+        return int(os.path.basename(path)[len('checkpoint-'):-len('.pt')])
+
+    def _raise_error(self):
+        """
+        Re-raise a failure from the writer thread on the training thread.
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
+
+    def _write_loop(self):
+        """
+        Write scheduled checkpoints until the manager is closed.
+        """
+        while True:
+            with self._condition:
+                while self._pending is None and not self._closed:
+                    self._condition.wait()
+                if self._pending is None:
+                    return
+                checkpoint, self._pending = self._pending, None
+                self._writing = True
+
+            try:
+                self._write(checkpoint)
+                self._rotate()
+                self.written += 1
+            except Exception as error:
+                self._error = error
+            finally:
+                with self._condition:
+                    self._writing = False
+                    self._condition.notify_all()
+
+    def _write(self, checkpoint):
+        """
+        Atomically write a checkpoint file.
+
+        Args:
+            checkpoint (dict): The snapshotted checkpoint.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, f"checkpoint-{checkpoint['step']:010d}.pt")
+
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(file_descriptor, 'wb') as file:
+                torch.save(checkpoint, file)
+                file.flush()
+                os.fsync(file.fileno())
+            os.replace(temporary_path, path)
+        except BaseException:
+            if os.path.exists(temporary_path):
+                os.unlink(temporary_path)
+            raise
+
+    def _rotate(self):
+        """
+        Delete all but the `keep_last` most recent checkpoints.
+        """
+        for path in self.checkpoints()[:-self.keep_last]:
+            os.unlink(path)
@@ -0,0 +1,263 @@
+import contextlib
+import hashlib
+import os
+import tempfile
+import threading
+
+from utils.lazy_import import lazy_import
+
+torch = lazy_import('torch')
+vision_models = lazy_import('vision_models')
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """
+    Compute the SHA-256 digest of a weights file.
+
+    Args:
+        path (str): The path to the file.
+        chunk_size (int): The number of bytes hashed at a time.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def state_dict_digest(state_dict):
+    """
+    Compute the SHA-256 digest of a model state dict.
+
+    Args:
+        state_dict (dict): The state dict to hash.
+
+    Returns:
+        str: The hex digest.
+    """
+    digest = hashlib.sha256()
+    for name, tensor in sorted(state_dict.items()):
+        digest.update(name.encode('utf-8'))
+        digest.update(tensor.detach().cpu().contiguous().numpy().tobytes())
+    return digest.hexdigest()
+
+
+def load_shared_weights(path):
+    """
+    Load a state dict backed by a memory map of the weights file.
+
+    Every process that maps the same file shares its pages through the page
+    cache, so N workers hold one copy of the weights instead of N.
+
+    Args:
+        path (str): The path to a weights file saved with torch.save.
+
+    Returns:
+        dict: The state dict.
+    """
+    try:
+        return torch.load(path, map_location='cpu', mmap=True, weights_only=True)
+    except TypeError:
+        # torch < 2.1 cannot memory-map checkpoints
+        return torch.load(path, map_location='cpu')
+
+
+class ModelRegistry:
+    """
+    A registry of shared, read-only model instances.
+
+    Models are keyed by architecture and weights digest. Acquiring a model that is
+    already loaded returns the same instance and increments its reference count;
+    the instance is evicted when the last reference is released. Weights loaded
+    from a file are memory-mapped so that worker processes share them too.
+    """
+
+    def __init__(self, store_dir=None):
+        """
+        Initializes a model registry.
+
+        Args:
+            store_dir (str): The directory `publish` writes shared weights files to.
+        """
+        self.store_dir = store_dir
+        self._entries = {}
+        self._keys = {}
+        self._digests = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, architecture, builder, weights_path=None):
+        """
+        Acquire a shared model instance, building it if it is not loaded yet.
+
+        Args:
+            architecture (str): A name identifying the model architecture and configuration.
+            builder (callable): Builds a new instance of the architecture.
+            weights_path (str): A weights file to load into the model. Without it, the
+                model keeps the weights its builder initializes.
+
+        Returns:
+            nn.Module: The shared model, in eval mode with gradients disabled.
+        """
+        digest = self._weights_digest(weights_path) if weights_path else None
+        key = (architecture, digest)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = {'model': None, 'refcount': 0, 'ready': threading.Event()}
+                self._entries[key] = entry
+                build = True
+            else:
+                build = False
+            entry['refcount'] += 1
+
+        if build:
+            try:
+                model = builder()
+                if weights_path:
+                    self._load_weights(model, weights_path)
+                model.eval()
+                model.requires_grad_(False)
+            except Exception:
+                with self._lock:
+                    del self._entries[key]
+                entry['ready'].set()
+                raise
+
+            with self._lock:
+                entry['model'] = model
+                self._keys[id(model)] = key
+            entry['ready'].set()
+        else:
+            entry['ready'].wait()
+            if entry['model'] is None:
+                raise RuntimeError(f"Building model {architecture!r} failed in another thread.")
+
+        return entry['model']
+
+    def acquire_resnet(self, depth, num_classes, weights_path=None):
+        """
+        Acquire a shared ResNetModel.
+
+        Args:
+            depth (int): The ResNet depth.
+            num_classes (int): The number of output classes.
+            weights_path (str): A weights file to load. Without it, the torchvision
+                pretrained backbone is used.
+
+        Returns:
+            ResNetModel: The shared model.
+        """
+        def build():
+            return vision_models.ResNetModel(depth, num_classes, pretrained=weights_path is None)
+
+        return self.acquire(f"resnet{depth}-{num_classes}", build, weights_path)
+
+    def release(self, model):
+        """
+        Release a reference to a shared model, evicting it when none remain.
+
+        Args:
+            model (nn.Module): A model returned by `acquire`.
+        """
+        with self._lock:
+            key = self._keys.get(id(model))
+            if key is None:
+                raise KeyError("Model was not acquired from this registry.")
+
+            entry = self._entries[key]
+            entry['refcount'] -= 1
+            if entry['refcount'] == 0:
+                del self._entries[key]
+                del self._keys[id(model)]
+
+    @contextlib.contextmanager
+    def lease(self, architecture, builder, weights_path=None):
+        """
+        Acquire a shared model for the duration of a with block.
+        """
+        model = self.acquire(architecture, builder, weights_path)
+        try:
+            yield model
+        finally:
+            self.release(model)
+
+    def publish(self, model, architecture):
+        """
+        Write a model's weights to the shared store so other processes can map them.
+
+        Args:
+            model (nn.Module): The model to publish.
+            architecture (str): The architecture name, used in the file name.
+
+        Returns:
+            str: The path to pass as `weights_path` to `acquire` in other processes.
+        """
+        if self.store_dir is None:
+            raise ValueError("The registry has no store_dir to publish to.")
+
+        state_dict = model.state_dict()
+        path = os.path.join(self.store_dir, f"{architecture}-{state_dict_digest(state_dict)[:16]}.pt")
+        if os.path.exists(path):
+            return path
+
+        os.makedirs(self.store_dir, exist_ok=True)
+        file_descriptor, temporary_path = tempfile.mkstemp(dir=self.store_dir, suffix='.tmp')
+        os.close(file_descriptor)
+        try:
+            torch.save(state_dict, temporary_path)
+            os.replace(temporary_path, path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+
+        return path
+
+    def _weights_digest(self, path):
+        """
+        Digest a weights file, reusing the last digest while the file is unchanged.
+
+        Args:
+            path (str): The path to the weights file.
+
+        Returns:
+            str: The hex digest.
+        """
+        stat = os.stat(path)
+        cache_key = (os.path.abspath(path), stat.st_mtime_ns, stat.st_size)
+        digest = self._digests.get(cache_key)
+        if digest is None:
+            digest = file_digest(path)
+            self._digests[cache_key] = digest
+        return digest
+
+    def _load_weights(self, model, path):
+        """
+        Load memory-mapped weights into a model without copying them.
+
+        Args:
+            model (nn.Module): The freshly built model.
+            path (str): The path to the weights file.
+        """
+        state_dict = load_shared_weights(path)
+        try:
+            # assign=True keeps the memory-mapped tensors instead of copying into fresh ones
+            model.load_state_dict(state_dict, assign=True)
+        except TypeError:
+            model.load_state_dict(state_dict)
+
+    def stats(self):
+        """
+        Report the loaded models and their reference counts.
+
+        Returns:
+            dict: The reference count of each (architecture, digest) key.
+        """
+        with self._lock:
+            return {key: entry['refcount'] for key, entry in self._entries.items()}
+
+
+default_registry = ModelRegistry()
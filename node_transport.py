@@ -0,0 +1,546 @@
+import concurrent.futures
+import itertools
+import json
+import socket
+import socketserver
+import struct
+import threading
+import zlib
+
+import numpy as np
+
+from utils.lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+
+MAGIC = b'ZV'
+
+REQUEST = 1
+RESPONSE = 2
+ERROR = 3
+
+RAW = 0
+ZLIB = 1
+PNG = 2
+JPEG = 3
+JSON = 4
+
+CODECS = {'none': RAW, 'zlib': ZLIB, 'png': PNG, 'jpeg': JPEG}
+
+# magic, message type, codec, request id, payload length
+HEADER = struct.Struct('!2sBBII')
+# dtype string, number of dimensions
+ARRAY_META = struct.Struct('!4sB')
+NAME_LENGTH = struct.Struct('!H')
+
+
+class RemoteNodeError(RuntimeError):
+    """
+    Raised when a remote worker fails to compute a node.
+    """
+
+
+def _recv_exact(sock, size):
+    """
+    Read exactly `size` bytes from a socket.
+
+    Args:
+        sock (socket.socket): The connected socket.
+        size (int): The number of bytes to read.
+
+    Returns:
+        bytes: The received bytes, or None if the peer closed the connection.
+    """
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if count == 0:
+            return None
+        received += count
+    return bytes(buffer)
+
+
+def read_message(sock):
+    """
+    Read one framed message from a socket.
+
+    Args:
+        sock (socket.socket): The connected socket.
+
+    Returns:
+        tuple: The (message type, codec, request id, payload), or None on end of stream.
+    """
+    header = _recv_exact(sock, HEADER.size)
+    if header is None:
+        return None
+
+    magic, message_type, codec, request_id, length = HEADER.unpack(header)
+    if magic != MAGIC:
+        raise ConnectionError("Invalid frame received from peer.")
+
+    payload = _recv_exact(sock, length) if length else b''
+    if payload is None:
+        return None
+
+    return message_type, codec, request_id, payload
+
+
+def write_message(sock, message_type, codec, request_id, payload):
+    """
+    Write one framed message to a socket.
+
+    Args:
+        sock (socket.socket): The connected socket.
+        message_type (int): REQUEST, RESPONSE or ERROR.
+        codec (int): The codec used for the payload.
+        request_id (int): The request the message belongs to.
+        payload (bytes): The encoded payload.
+    """
+    sock.sendall(HEADER.pack(MAGIC, message_type, codec, request_id, len(payload)) + payload)
+
+
+def encode_value(value, codec):
+    """
+    Encode a frame or a node result.
+
+    Arrays are sent as a small dtype/shape header followed by the pixel data,
+    optionally compressed. Lossy JPEG is only applied to 8-bit images; anything
+    else falls back to lossless zlib. Non-array results are sent as JSON.
+
+    Args:
+        value (numpy.ndarray or object): The value to encode.
+        codec (int): The requested codec for arrays.
+
+    Returns:
+        tuple: The (codec actually used, payload bytes).
+    """
+    if not isinstance(value, np.ndarray):
+        return JSON, json.dumps(value).encode('utf-8')
+
+    value = np.ascontiguousarray(value)
+    is_image = value.dtype == np.uint8 and (value.ndim == 2 or (value.ndim == 3 and value.shape[2] in (1, 3)))
+
+    if codec == JPEG and not is_image:
+        codec = ZLIB
+    if codec == PNG and not (is_image or value.dtype == np.uint16):
+        codec = ZLIB
+
+    meta = ARRAY_META.pack(value.dtype.str.encode('ascii'), value.ndim)
+    meta += struct.pack(f'!{value.ndim}I', *value.shape)
+
+    if codec == RAW:
+        data = value.tobytes()
+    elif codec == ZLIB:
+        data = zlib.compress(value.tobytes(), 1)
+    else:
+        extension = '.jpg' if codec == JPEG else '.png'
+        ok, encoded = cv2.imencode(extension, value)
+        if not ok:
+            raise ValueError(f"Unable to encode array as {extension}.")
+        data = encoded.tobytes()
+
+    return codec, meta + data
+
+
+def decode_value(codec, payload):
+    """
+    Decode a payload produced by `encode_value`.
+
+    Args:
+        codec (int): The codec the payload was encoded with.
+        payload (bytes): The encoded payload.
+
+    Returns:
+        numpy.ndarray or object: The decoded value. Arrays are writable.
+    """
+    if codec == JSON:
+        return json.loads(payload.decode('utf-8'))
+
+    dtype, ndim = ARRAY_META.unpack_from(payload)
+    shape = struct.unpack_from(f'!{ndim}I', payload, ARRAY_META.size)
+    data = memoryview(payload)[ARRAY_META.size + 4 * ndim:]
+    dtype = np.dtype(dtype.rstrip(b'\x00').decode('ascii'))
+
+    # bytearray keeps the arrays writable, so nodes and callers can modify them in place
+    if codec == RAW:
+        return np.frombuffer(bytearray(data), dtype=dtype).reshape(shape)
+    if codec == ZLIB:
+        return np.frombuffer(bytearray(zlib.decompress(data)), dtype=dtype).reshape(shape)
+
+    image = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_UNCHANGED)
+    return image.reshape(shape)
+
+
+class NodeConnection:
+    """
+    A single client connection that pipelines requests to a worker server.
+
+    Any number of requests can be in flight at once; responses are matched to
+    their futures by request id on a background reader thread.
+    """
+
+    def __init__(self, address, timeout=None):
+        """
+        Opens a connection to a worker server.
+
+        Args:
+            address (tuple): The (host, port) of the worker server.
+            timeout (float): The connect timeout in seconds.
+        """
+        self.address = address
+        self._sock = socket.create_connection(address, timeout=timeout)
+        self._sock.settimeout(None)
+        self._sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._send_lock = threading.Lock()
+        self._pending = {}
+        self._pending_lock = threading.Lock()
+        self._request_ids = itertools.count(1)
+        self.closed = False
+
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def submit(self, node_id, image, codec=RAW):
+        """
+        Send a node compute request without waiting for the result.
+
+        Args:
+            node_id (str): The ID of the node on the worker.
+            image (numpy.ndarray): The image to compute on.
+            codec (int): The codec to send the image with.
+
+        Returns:
+            concurrent.futures.Future: A future resolving to the node result.
+        """
+        if self.closed:
+            raise ConnectionError(f"Connection to {self.address} is closed.")
+
+        # Encode first so an unencodable image does not leave a future behind in _pending
+        name = node_id.encode('utf-8')
+        codec, payload = encode_value(image, codec)
+        payload = NAME_LENGTH.pack(len(name)) + name + payload
+
+        request_id = next(self._request_ids) & 0xFFFFFFFF
+        future = concurrent.futures.Future()
+        with self._pending_lock:
+            self._pending[request_id] = future
+
+        try:
+            with self._send_lock:
+                write_message(self._sock, REQUEST, codec, request_id, payload)
+        except OSError as error:
+            self._fail_pending(error)
+            raise
+
+        return future
+
+    @property
+    def in_flight(self):
+        """
+        The number of requests awaiting a response on this connection.
+        """
+        return len(self._pending)
+
+    def close(self):
+        """
+        Close the connection and fail any outstanding requests.
+        """
+        self.closed = True
+        try:
+            self._sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self._sock.close()
+
+    def _read_loop(self):
+        """
+        Resolve pending futures as responses arrive.
+        """
+        error = ConnectionError(f"Connection to {self.address} closed.")
+        try:
+            while True:
+                message = read_message(self._sock)
+                if message is None:
+                    break
+
+                message_type, codec, request_id, payload = message
+                with self._pending_lock:
+                    future = self._pending.pop(request_id, None)
+                if future is None:
+                    continue
+
+                if message_type == ERROR:
+                    future.set_exception(RemoteNodeError(payload.decode('utf-8')))
+                else:
+                    future.set_result(decode_value(codec, payload))
+        except (OSError, ValueError) as exc:
+            error = ConnectionError(f"Connection to {self.address} failed: {exc}")
+        finally:
+            self.closed = True
+            self._fail_pending(error)
+
+    def _fail_pending(self, error):
+        """
+        Fail every outstanding request with the given error.
+
+        Args:
+            error (Exception): The error to set on the pending futures.
+        """
+        with self._pending_lock:
+            pending, self._pending = self._pending, {}
+        for future in pending.values():
+            if not future.done():
+                future.set_exception(error)
+
+
+class ConnectionPool:
+    """
+    A pool of pipelined connections to one worker server.
+
+    Requests go to the open connection with the fewest in-flight requests;
+    closed connections are replaced on demand.
+    """
+
+    def __init__(self, address, size=2, timeout=5.0):
+        """
+        Initializes a connection pool.
+
+        Args:
+            address (tuple): The (host, port) of the worker server.
+            size (int): The maximum number of connections.
+            timeout (float): The connect timeout in seconds.
+        """
+        self.address = address
+        self.size = size
+        self.timeout = timeout
+        self._connections = []
+        self._connecting = 0
+        self._condition = threading.Condition()
+
+    def submit(self, node_id, image, codec=RAW):
+        """
+        Send a node compute request on a pooled connection.
+
+        Args:
+            node_id (str): The ID of the node on the worker.
+            image (numpy.ndarray): The image to compute on.
+            codec (int): The codec to send the image with.
+
+        Returns:
+            concurrent.futures.Future: A future resolving to the node result.
+        """
+        return self._acquire().submit(node_id, image, codec)
+
+    def close(self):
+        """
+        Close every pooled connection.
+        """
+        with self._condition:
+            connections, self._connections = self._connections, []
+        for connection in connections:
+            connection.close()
+
+    def _acquire(self):
+        """
+        Pick the least loaded open connection, opening a new one if allowed.
+
+        A new connection is opened outside the lock, so a slow connect does not
+        block requests that can use the connections already open.
+
+        Returns:
+            NodeConnection: The connection to send on.
+        """
+        with self._condition:
+            while True:
+                self._connections = [connection for connection in self._connections if not connection.closed]
+
+                idle = [connection for connection in self._connections if connection.in_flight == 0]
+                if idle:
+                    return idle[0]
+
+                if len(self._connections) + self._connecting < self.size:
+                    # Reserve the slot, then connect without holding the lock
+                    self._connecting += 1
+                    break
+
+                if self._connections:
+                    return min(self._connections, key=lambda connection: connection.in_flight)
+
+                # Every slot is still connecting; wait for one to open or fail
+                self._condition.wait()
+
+        connection = None
+        try:
+            connection = NodeConnection(self.address, timeout=self.timeout)
+        finally:
+            with self._condition:
+                self._connecting -= 1
+                if connection is not None:
+                    self._connections.append(connection)
+                self._condition.notify_all()
+
+        return connection
+
+
+class RemoteNode:
+    """
+    A Zeus node whose computation runs on a remote worker server.
+
+    It can be placed in a ZeusNodeGraph alongside local nodes.
+    """
+
+    def __init__(self, id, pool, remote_id=None, compression='none'):
+        """
+        Initializes a remote Zeus node.
+
+        Args:
+            id (str): The ID of the node in the local graph.
+            pool (ConnectionPool): The pool of connections to the worker hosting the node.
+            remote_id (str): The ID of the node on the worker. Defaults to `id`.
+            compression (str): The link compression for frames: 'none', 'zlib',
+                'png' (lossless) or 'jpeg' (lossy).
+        """
+        if compression not in CODECS:
+            raise ValueError(f"Unknown compression {compression!r}.")
+
+        self.id = id
+        self.pool = pool
+        self.remote_id = remote_id or id
+        self.compression = compression
+
+    def __repr__(self):
+        return f"RemoteNode(id={self.id!r}, address={self.pool.address})"
+
+    def submit(self, image):
+        """
+        Send the image to the remote node without waiting for the result.
+
+        Args:
+            image (numpy.ndarray): The image to perform the vision computation on.
+
+        Returns:
+            concurrent.futures.Future: A future resolving to the node result.
+        """
+        return self.pool.submit(self.remote_id, image, CODECS[self.compression])
+
+    def compute(self, image):
+        """
+        Performs the vision computation on the remote worker.
+
+        Args:
+            image (numpy.ndarray): The image to perform the vision computation on.
+
+        Returns:
+            object: The result of the remote vision computation.
+        """
+        return self.submit(image).result()
+
+
+class _NodeRequestHandler(socketserver.BaseRequestHandler):
+    """
+    Serves pipelined node compute requests on one client connection.
+    """
+
+    def handle(self):
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        send_lock = threading.Lock()
+
+        while True:
+            try:
+                message = read_message(self.request)
+            except OSError:
+                break
+            if message is None:
+                break
+
+            _, codec, request_id, payload = message
+            self.server.executor.submit(self._compute, send_lock, codec, request_id, payload)
+
+    def _compute(self, send_lock, codec, request_id, payload):
+        """
+        Compute one request and write its response.
+        """
+        try:
+            (name_length,) = NAME_LENGTH.unpack_from(payload)
+            node_id = payload[NAME_LENGTH.size:NAME_LENGTH.size + name_length].decode('utf-8')
+            image = decode_value(codec, payload[NAME_LENGTH.size + name_length:])
+
+            node = self.server.nodes.get(node_id)
+            if node is None:
+                raise KeyError(f"Unknown node {node_id!r}.")
+
+            # Results go back losslessly; only compress them if the link is compressed
+            response_codec = RAW if codec == RAW else ZLIB
+            message_type = RESPONSE
+            response_codec, response = encode_value(node.compute(image), response_codec)
+        except Exception as error:
+            message_type = ERROR
+            response_codec = RAW
+            response = f"{type(error).__name__}: {error}".encode('utf-8')
+
+        try:
+            with send_lock:
+                write_message(self.request, message_type, response_codec, request_id, response)
+        except OSError:
+            pass
+
+
+class NodeWorkerServer(socketserver.ThreadingTCPServer):
+    """
+    A worker server hosting Zeus nodes for remote graphs.
+
+    Bound to the loopback interface with an ephemeral port, it stands in for a
+    remote host in tests.
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, nodes, host='127.0.0.1', port=0, max_workers=None):
+        """
+        Initializes a worker server.
+
+        Args:
+            nodes (list): The nodes to serve. Each needs an `id` and a `compute(image)` method.
+            host (str): The interface to bind to.
+            port (int): The port to bind to, or 0 for an ephemeral port.
+            max_workers (int): The number of threads computing requests.
+        """
+        self.nodes = {node.id: node for node in nodes}
+        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._thread = None
+        super().__init__((host, port), _NodeRequestHandler)
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def address(self):
+        """
+        The (host, port) the server is listening on.
+        """
+        return self.server_address[:2]
+
+    def start(self):
+        """
+        Serve requests on a background thread.
+        """
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        Stop serving and release the listening socket.
+        """
+        if self._thread is not None:
+            self.shutdown()
+            self._thread.join()
+            self._thread = None
+        self.server_close()
+        self.executor.shutdown(wait=False)
@@ -0,0 +1,173 @@
+import collections
+import threading
+import time
+
+from utils.vision_utils import resize_image
+
+# Each level degrades a little more than the previous one
+DEFAULT_LEVELS = (
+    {'scale': 1.0, 'skip_optional': False, 'keep_every': 1},
+    {'scale': 1.0, 'skip_optional': True, 'keep_every': 1},
+    {'scale': 0.75, 'skip_optional': True, 'keep_every': 1},
+    {'scale': 0.5, 'skip_optional': True, 'keep_every': 1},
+    {'scale': 0.5, 'skip_optional': True, 'keep_every': 2},
+    {'scale': 0.5, 'skip_optional': True, 'keep_every': 4},
+)
+
+
+class QualityController:
+    """
+    Adapts processing quality to keep per-frame latency within an SLO.
+
+    The controller tracks an exponentially weighted per-frame latency. When it
+    stays above the SLO it steps down a ladder of quality levels (skip optional
+    nodes, lower the input resolution, drop frames); when there is headroom again
+    it steps back up. Every level change is counted and logged in `metrics`.
+    """
+
+    def __init__(self, slo, levels=DEFAULT_LEVELS, smoothing=0.3, headroom=0.7,
+                 degrade_after=3, restore_after=30, history=100):
+        """
+        Initializes a quality controller.
+
+        Args:
+            slo (float): The per-frame latency target in seconds.
+            levels (tuple): The quality levels, from full quality to most degraded. Each
+                is a dict with `scale`, `skip_optional` and `keep_every` entries.
+            smoothing (float): The weight of the newest sample in the latency estimate.
+            headroom (float): Quality is restored once latency falls below `headroom * slo`.
+            degrade_after (int): The number of consecutive frames over the SLO before degrading.
+            restore_after (int): The number of consecutive frames with headroom before restoring.
+            history (int): The number of level changes kept in the decision log.
+        """
+        self.slo = slo
+        self.levels = levels
+        self.smoothing = smoothing
+        self.headroom = headroom
+        self.degrade_after = degrade_after
+        self.restore_after = restore_after
+
+        self.level = 0
+        self.latency = None
+        self.decisions = collections.deque(maxlen=history)
+        self.counters = collections.Counter()
+
+        self._over = 0
+        self._under = 0
+        self._frame = 0
+        self._lock = threading.Lock()
+
+    @property
+    def scale(self):
+        """
+        The input resolution scale of the current level.
+        """
+        return self.levels[self.level]['scale']
+
+    @property
+    def skip_optional(self):
+        """
+        Whether optional nodes are skipped at the current level.
+        """
+        return self.levels[self.level]['skip_optional']
+
+    def admit(self):
+        """
+        Decide whether the next frame should be processed or dropped.
+
+        Returns:
+            bool: True if the frame should be processed.
+        """
+        with self._lock:
+            keep_every = self.levels[self.level]['keep_every']
+            admitted = self._frame % keep_every == 0
+            self._frame += 1
+            self.counters['frames_admitted' if admitted else 'frames_dropped'] += 1
+            return admitted
+
+    def prepare(self, image):
+        """
+        Scale a frame down to the resolution of the current level.
+
+        Args:
+            image (numpy.ndarray): The input frame.
+
+        Returns:
+            numpy.ndarray: The frame to process.
+        """
+        scale = self.scale
+        if scale >= 1.0:
+            return image
+
+        height, width = image.shape[:2]
+        return resize_image(image, (max(1, int(width * scale)), max(1, int(height * scale))))
+
+    def record(self, latency):
+        """
+        Record the latency of a processed frame and adjust the quality level.
+
+        Args:
+            latency (float): The time taken to process the frame, in seconds.
+        """
+        with self._lock:
+            if self.latency is None:
+                self.latency = latency
+            else:
+                self.latency += self.smoothing * (latency - self.latency)
+
+            if self.latency > self.slo:
+                self._over += 1
+                self._under = 0
+            elif self.latency < self.headroom * self.slo:
+                self._under += 1
+                self._over = 0
+            else:
+                self._over = self._under = 0
+
+            if self._over >= self.degrade_after and self.level < len(self.levels) - 1:
+                self._change_level(self.level + 1, 'degrade')
+            elif self._under >= self.restore_after and self.level > 0:
+                self._change_level(self.level - 1, 'restore')
+
+    def metrics(self):
+        """
+        Report the current level, latency estimate, counters and recent decisions.
+
+        Returns:
+            dict: The controller metrics.
+        """
+        with self._lock:
+            return {
+                'level': self.level,
+                'scale': self.scale,
+                'skip_optional': self.skip_optional,
+                'keep_every': self.levels[self.level]['keep_every'],
+                'latency': self.latency,
+                'slo': self.slo,
+                'counters': dict(self.counters),
+                'decisions': list(self.decisions),
+            }
+
+    def _change_level(self, level, action):
+        """
+        Move to another quality level and log the decision.
+
+        Must be called with the lock held.
+
+        Args:
+            level (int): The new level.
+            action (str): 'degrade' or 'restore'.
+        """
+        self.decisions.append({
+            'time': time.time(),
+            'action': action,
+            'from_level': self.level,
+            'to_level': level,
+            'latency': self.latency,
+        })
+        self.counters[action] += 1
+        self.counters[f'{action}_to_level_{level}'] += 1
+        self.level = level
+        self._over = self._under = 0
+        # The estimate describes the old level; the next frame re-seeds it
+        self.latency = None
@@ -0,0 +1,344 @@
+import concurrent.futures
+import heapq
+import itertools
+import threading
+import time
+
+
+class DeadlineExceeded(TimeoutError):
+    """
+    Raised for a task that could not start before its deadline.
+    """
+
+
+def local_backend(node, image):
+    """
+    Compute a node in the calling worker thread.
+
+    Args:
+        node (ZeusNode): The node to compute.
+        image (numpy.ndarray): The image to compute on.
+
+    Returns:
+        object: The result of the node computation.
+    """
+    return node.compute(image)
+
+
+class ProcessBackend:
+    """
+    Computes nodes in a dedicated worker process.
+    """
+
+    def __init__(self):
+        self.executor = concurrent.futures.ProcessPoolExecutor(max_workers=1)
+
+    def __call__(self, node, image):
+        return self.executor.submit(local_backend, node, image).result()
+
+    def close(self):
+        """
+        Shut down the worker process.
+        """
+        self.executor.shutdown()
+
+
+class RemoteBackend:
+    """
+    Computes nodes on a remote worker server through a connection pool.
+    """
+
+    def __init__(self, pool, compression='none'):
+        """
+        Initializes a remote backend.
+
+        Args:
+            pool (ConnectionPool): The pool of connections to the worker server.
+            compression (str): The link compression for frames.
+        """
+        from node_transport import CODECS
+
+        self.pool = pool
+        self.codec = CODECS[compression]
+
+    def __call__(self, node, image):
+        return self.pool.submit(node.id, image, self.codec).result()
+
+    def close(self):
+        """
+        Close the pooled connections. The pool reconnects if it is used again.
+        """
+        self.pool.close()
+
+
+class _Task:
+    """
+    A queued node computation.
+    """
+
+    __slots__ = ('priority', 'sequence', 'node', 'image', 'deadline', 'future', 'estimate')
+
+    def __init__(self, priority, sequence, node, image, deadline, future):
+        self.priority = priority
+        self.sequence = sequence
+        self.node = node
+        self.image = image
+        self.deadline = deadline
+        self.future = future
+        self.estimate = 0.0
+
+    def __lt__(self, other):
+        return (self.priority, self.sequence) < (other.priority, other.sequence)
+
+
+class RouterWorker:
+    """
+    A worker with its own priority queue and per-task-kind latency estimates.
+    """
+
+    def __init__(self, name, backend):
+        """
+        Initializes a router worker.
+
+        Args:
+            name (str): The name of the worker.
+            backend (callable): Called as `backend(node, image)` to compute a task.
+        """
+        self.name = name
+        self.backend = backend
+        self.latencies = {}
+        self.queue = []
+        self.queued_cost = 0.0
+        self.busy_until = 0.0
+        self.running = False
+        self.completed = 0
+        self.stolen = 0
+
+    def estimate(self, kind, default):
+        """
+        Estimate how long this worker takes for a kind of task.
+
+        Args:
+            kind (str): The task kind.
+            default (float): The estimate to use when the worker has no history.
+
+        Returns:
+            float: The estimated latency in seconds.
+        """
+        return self.latencies.get(kind, default)
+
+    def expected_completion(self, kind, default, now):
+        """
+        Estimate when a new task of the given kind would complete on this worker.
+
+        Args:
+            kind (str): The task kind.
+            default (float): The estimate to use when the worker has no history.
+            now (float): The current time.
+
+        Returns:
+            float: The expected completion delay in seconds.
+        """
+        remaining = max(0.0, self.busy_until - now)
+        return remaining + self.queued_cost + self.estimate(kind, default)
+
+
+class TaskRouter:
+    """
+    Routes node computations to the worker with the lowest expected completion time.
+
+    Each worker keeps an exponentially weighted latency estimate per node ID,
+    tasks are ordered by priority within a worker, tasks that miss their deadline
+    before starting are failed with DeadlineExceeded, and idle workers steal
+    queued work from busy ones.
+    """
+
+    def __init__(self, backends, smoothing=0.2, default_latency=0.01):
+        """
+        Initializes a task router and starts its worker threads.
+
+        Args:
+            backends (list or dict): The worker backends, optionally keyed by worker name.
+                Each is called as `backend(node, image)`, and closed with the router if
+                it has a `close` method.
+            smoothing (float): The weight of the newest sample in latency estimates.
+            default_latency (float): The latency assumed for task kinds never seen before.
+        """
+        if not isinstance(backends, dict):
+            backends = {f"worker-{index}": backend for index, backend in enumerate(backends)}
+        if not backends:
+            raise ValueError("At least one backend is required.")
+
+        self.smoothing = smoothing
+        self.default_latency = default_latency
+        self.workers = [RouterWorker(name, backend) for name, backend in backends.items()]
+
+        self._kind_latencies = {}
+        self._sequence = itertools.count()
+        self._condition = threading.Condition()
+        self._closed = False
+        self._threads = []
+        for worker in self.workers:
+            thread = threading.Thread(target=self._work, args=(worker,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def submit(self, node, image, priority=None, deadline=None):
+        """
+        Route a node computation to a worker.
+
+        Args:
+            node (ZeusNode): The node to compute. Its `id` is the task kind.
+            image (numpy.ndarray): The image to compute on.
+            priority (int): Lower values run first. Defaults to the node's
+                `priority` attribute, or 0.
+            deadline (float): An absolute `time.monotonic()` deadline for the task to start.
+
+        Returns:
+            concurrent.futures.Future: A future resolving to the node result.
+        """
+        if priority is None:
+            priority = getattr(node, 'priority', 0)
+
+        future = concurrent.futures.Future()
+        task = _Task(priority, next(self._sequence), node, image, deadline, future)
+
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot submit to a closed TaskRouter.")
+
+            now = time.monotonic()
+            default = self._kind_latencies.get(node.id, self.default_latency)
+            worker = min(self.workers, key=lambda worker: worker.expected_completion(node.id, default, now))
+
+            task.estimate = worker.estimate(node.id, default)
+            heapq.heappush(worker.queue, task)
+            worker.queued_cost += task.estimate
+            self._condition.notify_all()
+
+        return future
+
+    def stats(self):
+        """
+        Report per-worker queue depths, latency estimates and steal counts.
+
+        Returns:
+            dict: The statistics of each worker, keyed by worker name.
+        """
+        with self._condition:
+            return {
+                worker.name: {
+                    'queue_depth': len(worker.queue),
+                    'queued_cost': worker.queued_cost,
+                    'completed': worker.completed,
+                    'stolen': worker.stolen,
+                    'latencies': dict(worker.latencies),
+                }
+                for worker in self.workers
+            }
+
+    def close(self):
+        """
+        Finish the queued tasks, stop the worker threads and close the backends.
+        """
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify_all()
+
+        for thread in self._threads:
+            thread.join()
+
+        for worker in self.workers:
+            close = getattr(worker.backend, 'close', None)
+            if close is not None:
+                close()
+
+    def _next_task(self, worker):
+        """
+        Take the next task for a worker, stealing from the most loaded busy worker if idle.
+
+        Must be called with the condition held.
+
+        Args:
+            worker (RouterWorker): The worker asking for work.
+
+        Returns:
+            _Task: The task to run, or None if there is nothing to do.
+        """
+        source = worker
+        if not worker.queue:
+            # A running worker's queue is fair game even once its task overruns the estimate
+            victims = [other for other in self.workers if other.queue and other.running]
+            if not victims:
+                return None
+            source = max(victims, key=lambda other: other.queued_cost)
+            worker.stolen += 1
+
+        task = heapq.heappop(source.queue)
+        source.queued_cost = max(0.0, source.queued_cost - task.estimate)
+        return task
+
+    def _work(self, worker):
+        """
+        Run tasks for one worker until the router is closed and drained.
+
+        Args:
+            worker (RouterWorker): The worker to run.
+        """
+        while True:
+            with self._condition:
+                task = self._next_task(worker)
+                while task is None:
+                    if self._closed and not any(other.queue for other in self.workers):
+                        return
+                    self._condition.wait(timeout=0.05)
+                    task = self._next_task(worker)
+
+                kind = task.node.id
+                start = time.monotonic()
+                if not task.future.set_running_or_notify_cancel():
+                    continue
+                if task.deadline is not None and start > task.deadline:
+                    task.future.set_exception(DeadlineExceeded(f"Task for node {kind!r} missed its deadline."))
+                    continue
+
+                worker.busy_until = start + worker.estimate(kind, self._kind_latencies.get(kind, self.default_latency))
+                worker.running = True
+
+            try:
+                result = worker.backend(task.node, task.image)
+            except Exception as error:
+                task.future.set_exception(error)
+            else:
+                task.future.set_result(result)
+
+            elapsed = time.monotonic() - start
+            with self._condition:
+                worker.latencies[kind] = self._smooth(worker.latencies.get(kind), elapsed)
+                self._kind_latencies[kind] = self._smooth(self._kind_latencies.get(kind), elapsed)
+                worker.busy_until = 0.0
+                worker.running = False
+                worker.completed += 1
+
+    def _smooth(self, previous, sample):
+        """
+        Blend a latency sample into an exponentially weighted estimate.
+
+        Args:
+            previous (float): The current estimate, or None.
+            sample (float): The new latency sample.
+
+        Returns:
+            float: The updated estimate.
+        """
+        if previous is None:
+            return sample
+        return previous + self.smoothing * (sample - previous)
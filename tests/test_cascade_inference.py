@@ -0,0 +1,112 @@
+import pytest
+
+from cascade_inference import CascadeClassifier
+
+
+class FakeRegistry:
+    def __init__(self, fail_depth=None):
+        self.fail_depth = fail_depth
+        self.held = []
+
+    def acquire_resnet(self, depth, num_classes, weights_path=None):
+        if depth == self.fail_depth:
+            raise RuntimeError("build failed")
+        model = f"resnet{depth}"
+        self.held.append(model)
+        return model
+
+    def release(self, model):
+        self.held.remove(model)
+
+
+def test_close_releases_acquired_stages():
+    registry = FakeRegistry()
+    with CascadeClassifier.from_depths([18, 50], num_classes=10, registry=registry) as cascade:
+        assert registry.held == ['resnet18', 'resnet50']
+        assert cascade.stages == ['resnet18', 'resnet50']
+    assert registry.held == []
+
+    # Closing again must not release twice
+    cascade.close()
+
+
+def test_from_depths_releases_stages_when_building_fails():
+    registry = FakeRegistry(fail_depth=50)
+    with pytest.raises(RuntimeError):
+        CascadeClassifier.from_depths([18, 50], num_classes=10, registry=registry)
+    assert registry.held == []
+
+
+def make_stage(torch, weight, bias):
+    class RecordingLinear(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.linear = torch.nn.Linear(2, 2)
+            with torch.no_grad():
+                self.linear.weight.copy_(torch.tensor(weight, dtype=torch.float32))
+                self.linear.bias.copy_(torch.tensor(bias, dtype=torch.float32))
+            self.batch_sizes = []
+
+        def forward(self, inputs):
+            self.batch_sizes.append(inputs.size(0))
+            return self.linear(inputs)
+
+    return RecordingLinear()
+
+
+def make_cascade(torch, thresholds=(0.9,)):
+    # The first stage's logits are its inputs; the second always predicts class 1
+    first = make_stage(torch, [[1.0, 0.0], [0.0, 1.0]], [0.0, 0.0])
+    second = make_stage(torch, [[0.0, 0.0], [0.0, 0.0]], [0.0, 3.0])
+    return CascadeClassifier([first, second], list(thresholds))
+
+
+def test_predict_escalates_only_low_confidence_samples():
+    torch = pytest.importorskip('torch')
+    cascade = make_cascade(torch)
+    images = torch.tensor([[5.0, 0.0], [0.1, 0.0], [0.0, 6.0], [0.2, 0.1]])
+
+    predictions, confidences, exit_stages = cascade.predict(images)
+
+    assert predictions.tolist() == [0, 1, 1, 1]
+    assert exit_stages.tolist() == [0, 1, 0, 1]
+    assert confidences[0].item() == pytest.approx(torch.sigmoid(torch.tensor(5.0)).item())
+    # The escalated samples reach the second stage together, as one batch
+    assert cascade.stages[0].batch_sizes == [4]
+    assert cascade.stages[1].batch_sizes == [2]
+
+
+def test_stats_report_hit_rates_and_shares():
+    torch = pytest.importorskip('torch')
+    cascade = make_cascade(torch)
+    cascade.predict(torch.tensor([[5.0, 0.0], [0.1, 0.0], [0.0, 6.0], [0.2, 0.1]]))
+
+    first, second = cascade.stats()
+    assert (first['entered'], first['exited'], first['hit_rate'], first['share']) == (4, 2, 0.5, 0.5)
+    assert (second['entered'], second['exited'], second['hit_rate'], second['share']) == (2, 2, 1.0, 0.5)
+    assert first['threshold'] == 0.9 and second['threshold'] is None
+
+    cascade.reset_stats()
+    assert cascade.stats()[0]['entered'] == 0
+
+
+def test_calibrate_picks_lowest_confidence_that_keeps_target_accuracy():
+    torch = pytest.importorskip('torch')
+    cascade = make_cascade(torch)
+    # Confidences sigmoid(5) > sigmoid(4) > sigmoid(1) > sigmoid(0.5); only the least confident is wrong
+    inputs = torch.tensor([[5.0, 0.0], [0.0, 4.0], [1.0, 0.0], [0.5, 0.0]])
+    validation = torch.utils.data.TensorDataset(inputs, torch.tensor([0, 1, 0, 1]))
+
+    thresholds = cascade.calibrate(validation, batch_size=2, target_accuracy=100.0)
+
+    assert thresholds == [pytest.approx(torch.sigmoid(torch.tensor(1.0)).item())]
+    assert cascade.thresholds == thresholds
+
+
+def test_calibrate_escalates_everything_when_no_threshold_is_accurate_enough():
+    torch = pytest.importorskip('torch')
+    cascade = make_cascade(torch)
+    inputs = torch.tensor([[5.0, 0.0], [0.0, 4.0], [1.0, 0.0], [0.5, 0.0]])
+    validation = torch.utils.data.TensorDataset(inputs, torch.tensor([1, 0, 1, 0]))
+
+    assert cascade.calibrate(validation, target_accuracy=100.0) == [float('inf')]
@@ -0,0 +1,26 @@
+import pytest
+
+from checkpointing import CheckpointManager
+
+
+def test_mark_restarts_step_interval(tmp_path):
+    with CheckpointManager(str(tmp_path), every_steps=10) as manager:
+        assert manager.due(10)
+
+        # A resumed run restarts the interval from the restored step
+        manager.mark(100)
+        assert not manager.due(105)
+        assert manager.due(110)
+
+
+def test_keep_last_must_be_positive(tmp_path):
+    with pytest.raises(ValueError):
+        CheckpointManager(str(tmp_path), keep_last=0)
+
+
+def test_fresh_run_refuses_directory_with_later_checkpoints(tmp_path):
+    (tmp_path / 'checkpoint-0000000100.pt').write_bytes(b'')
+
+    with CheckpointManager(str(tmp_path)) as manager:
+        with pytest.raises(ValueError, match='step 100'):
+            manager.save(5, model=None, optimizer=None)
@@ -0,0 +1,87 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+pytest.importorskip('numpy')
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# vision_models subclasses nn.Module and therefore imports torch eagerly
+MODULES = [
+    'ZeusNode',
+    'ZeusVisionProtocol',
+    'adapter_registry',
+    'cascade_inference',
+    'checkpointing',
+    'model_registry',
+    'node_transport',
+    'quality_controller',
+    'task_router',
+    'video_source',
+    'vision_network',
+    'vision_processor',
+    'vision_service',
+    'vision_trainer',
+    'zeuslightingadapter',
+    'zeusnodeprotocol',
+    'utils.buffer_pool',
+    'utils.lazy_import',
+    'utils.vision_utils',
+]
+
+HEAVY_MODULES = ['cv2', 'torch', 'torchvision', 'skimage']
+
+IMPORT_BUDGET_SECONDS = 1.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed': elapsed, 'loaded': [name for name in {heavy!r} if name in sys.modules]}}))
+"""
+
+
+def _import_in_subprocess(module):
+    # numpy is imported before timing so the budget measures this repository's own import cost
+    code = "import numpy\n" + _PROBE.format(module=module, heavy=HEAVY_MODULES)
+    completed = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    assert completed.returncode == 0, completed.stderr
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_import_loads_no_heavy_backends(module):
+    result = _import_in_subprocess(module)
+    assert result['loaded'] == []
+
+
+@pytest.mark.parametrize('module', MODULES)
+def test_import_time_within_budget(module):
+    result = _import_in_subprocess(module)
+    assert result['elapsed'] < IMPORT_BUDGET_SECONDS
+
+
+def test_import_has_no_output():
+    completed = subprocess.run(
+        [sys.executable, '-c', 'import ' + ', '.join(MODULES)], cwd=ROOT, capture_output=True, text=True, timeout=60
+    )
+    assert completed.returncode == 0, completed.stderr
+    assert completed.stdout == ''
+
+
+def test_adapter_registry_resolves_without_importing_backends():
+    code = (
+        "import sys, adapter_registry\n"
+        "assert adapter_registry.available_adapters() == ['opencv', 'scikit-image']\n"
+        "adapter = adapter_registry.create_adapter('opencv')\n"
+        "assert type(adapter).__name__ == 'OpenCVAdapter'\n"
+        "assert 'cv2' not in sys.modules and 'skimage' not in sys.modules\n"
+    )
+    completed = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, timeout=60)
+    assert completed.returncode == 0, completed.stderr
@@ -0,0 +1,27 @@
+import sys
+
+import pytest
+
+from utils.lazy_import import lazy_import
+
+
+def test_module_is_imported_on_first_attribute_access():
+    sys.modules.pop('colorsys', None)
+    colorsys = lazy_import('colorsys')
+    assert 'colorsys' not in sys.modules
+
+    assert colorsys.rgb_to_hsv(1.0, 0.0, 0.0)[0] == 0.0
+    assert 'colorsys' in sys.modules
+
+
+def test_submodule_is_resolved_as_attribute():
+    xml = lazy_import('xml')
+    assert xml.dom.__name__ == 'xml.dom'
+
+
+def test_missing_attribute_raises_attribute_error():
+    json = lazy_import('json')
+    assert getattr(json, 'NOPE', 0) == 0
+    assert not hasattr(json, 'NOPE')
+    with pytest.raises(AttributeError):
+        json.NOPE
@@ -0,0 +1,158 @@
+import os
+import threading
+import time
+
+import pytest
+
+import model_registry
+from model_registry import ModelRegistry
+
+
+class FakeModel:
+    def __init__(self):
+        self.training = True
+        self.requires_grad = True
+
+    def eval(self):
+        self.training = False
+        return self
+
+    def requires_grad_(self, requires_grad):
+        self.requires_grad = requires_grad
+        return self
+
+
+def test_acquire_shares_one_instance_and_freezes_it():
+    registry = ModelRegistry()
+    builds = []
+
+    def builder():
+        builds.append(1)
+        return FakeModel()
+
+    first = registry.acquire('fake', builder)
+    second = registry.acquire('fake', builder)
+
+    assert first is second
+    assert len(builds) == 1
+    assert not first.training and not first.requires_grad
+    assert registry.stats() == {('fake', None): 2}
+
+
+def test_release_evicts_at_zero():
+    registry = ModelRegistry()
+    model = registry.acquire('fake', FakeModel)
+    registry.acquire('fake', FakeModel)
+
+    registry.release(model)
+    assert registry.stats() == {('fake', None): 1}
+
+    registry.release(model)
+    assert registry.stats() == {}
+    with pytest.raises(KeyError):
+        registry.release(model)
+
+    # A fresh acquire builds a new instance
+    assert registry.acquire('fake', FakeModel) is not model
+
+
+def test_lease_releases_on_exit():
+    registry = ModelRegistry()
+    with registry.lease('fake', FakeModel) as model:
+        assert isinstance(model, FakeModel)
+        assert registry.stats() == {('fake', None): 1}
+    assert registry.stats() == {}
+
+
+def test_failed_build_removes_entry_and_fails_waiters():
+    registry = ModelRegistry()
+    fail = threading.Event()
+    errors = []
+
+    def builder():
+        assert fail.wait(5)
+        raise RuntimeError("build failed")
+
+    def acquire(builder):
+        try:
+            registry.acquire('fake', builder)
+        except RuntimeError as error:
+            errors.append(error)
+
+    threads = [threading.Thread(target=acquire, args=(builder,)), threading.Thread(target=acquire, args=(FakeModel,))]
+    threads[0].start()
+    threads[1].start()
+    # Fail the build only once the second thread is waiting on it
+    while registry.stats().get(('fake', None)) != 2:
+        time.sleep(0.01)
+    fail.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert len(errors) == 2
+    assert registry.stats() == {}
+
+    # The failure is not cached; the next acquire builds again
+    assert isinstance(registry.acquire('fake', FakeModel), FakeModel)
+
+
+def test_models_are_keyed_by_weights_digest(tmp_path, monkeypatch):
+    registry = ModelRegistry()
+    monkeypatch.setattr(registry, '_load_weights', lambda model, path: None)
+
+    first_path, same_path, other_path = tmp_path / 'a.pt', tmp_path / 'b.pt', tmp_path / 'c.pt'
+    first_path.write_bytes(b'weights')
+    same_path.write_bytes(b'weights')
+    other_path.write_bytes(b'other weights')
+
+    first = registry.acquire('fake', FakeModel, str(first_path))
+    assert registry.acquire('fake', FakeModel, str(same_path)) is first
+    assert registry.acquire('fake', FakeModel, str(other_path)) is not first
+
+
+def test_weights_digest_is_cached_until_the_file_changes(tmp_path, monkeypatch):
+    registry = ModelRegistry()
+    digests = []
+    monkeypatch.setattr(model_registry, 'file_digest', lambda path: digests.append(path) or f"digest-{len(digests)}")
+
+    path = tmp_path / 'weights.pt'
+    path.write_bytes(b'weights')
+    assert registry._weights_digest(str(path)) == registry._weights_digest(str(path))
+    assert len(digests) == 1
+
+    path.write_bytes(b'new weights')
+    assert registry._weights_digest(str(path)) == 'digest-2'
+
+
+def test_publish_needs_a_store_dir():
+    with pytest.raises(ValueError):
+        ModelRegistry().publish(FakeModel(), 'fake')
+
+
+def test_publish_round_trip(tmp_path):
+    torch = pytest.importorskip('torch')
+    registry = ModelRegistry(store_dir=str(tmp_path))
+    source = torch.nn.Linear(4, 2)
+
+    path = registry.publish(source, 'linear')
+    assert registry.publish(source, 'linear') == path
+    assert [entry.name for entry in tmp_path.iterdir()] == [os.path.basename(path)]
+
+    model = registry.acquire('linear', lambda: torch.nn.Linear(4, 2), path)
+    for name, tensor in source.state_dict().items():
+        assert torch.equal(model.state_dict()[name], tensor)
+
+
+def test_failed_publish_leaves_no_files(tmp_path, monkeypatch):
+    torch = pytest.importorskip('torch')
+    registry = ModelRegistry(store_dir=str(tmp_path))
+
+    def failing_save(state_dict, path):
+        with open(path, 'wb') as file:
+            file.write(b'partial')
+        raise OSError("disk full")
+
+    monkeypatch.setattr(torch, 'save', failing_save)
+    with pytest.raises(OSError):
+        registry.publish(torch.nn.Linear(4, 2), 'linear')
+    assert list(tmp_path.iterdir()) == []
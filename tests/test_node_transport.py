@@ -0,0 +1,158 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+from node_transport import (
+    CODECS, RAW, ConnectionPool, NodeConnection, NodeWorkerServer, RemoteNode, RemoteNodeError
+)
+
+
+class EchoNode:
+    id = 'echo'
+
+    def compute(self, image):
+        return image
+
+
+class StatsNode:
+    id = 'stats'
+
+    def compute(self, image):
+        return {'shape': list(image.shape), 'mean': float(image.mean())}
+
+
+class FailingNode:
+    id = 'failing'
+
+    def compute(self, image):
+        raise ValueError("bad frame")
+
+
+class DrawNode:
+    id = 'draw'
+
+    def compute(self, image):
+        # Draws on the frame in place, as a local node may
+        image[0, 0] = 255
+        return image
+
+
+class BarrierNode:
+    id = 'barrier'
+
+    def __init__(self, parties):
+        self.barrier = threading.Barrier(parties, timeout=5)
+
+    def compute(self, image):
+        # Only returns once `parties` requests are being computed at the same time
+        self.barrier.wait()
+        return image
+
+
+def make_image():
+    rows = np.arange(32, dtype=np.uint8)[:, None, None]
+    return np.broadcast_to(rows * 4, (32, 48, 3)).copy()
+
+
+@pytest.fixture
+def server():
+    with NodeWorkerServer([EchoNode(), StatsNode(), FailingNode(), DrawNode(), BarrierNode(4)], max_workers=8) as server:
+        yield server
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib', 'png'])
+def test_lossless_round_trip(server, compression):
+    pool = ConnectionPool(server.address)
+    try:
+        image = make_image()
+        result = RemoteNode('echo', pool, compression=compression).compute(image)
+        assert result.dtype == image.dtype
+        np.testing.assert_array_equal(result, image)
+    finally:
+        pool.close()
+
+
+def test_jpeg_round_trip_is_close(server):
+    pool = ConnectionPool(server.address)
+    try:
+        image = make_image()
+        result = RemoteNode('echo', pool, compression='jpeg').compute(image)
+        assert result.shape == image.shape
+        assert np.abs(result.astype(int) - image.astype(int)).mean() < 4
+    finally:
+        pool.close()
+
+
+def test_jpeg_falls_back_to_lossless_for_non_images(server):
+    pool = ConnectionPool(server.address)
+    try:
+        values = np.linspace(0, 1, 24, dtype=np.float32).reshape(4, 6)
+        np.testing.assert_array_equal(RemoteNode('echo', pool, compression='jpeg').compute(values), values)
+    finally:
+        pool.close()
+
+
+def test_non_array_results_are_sent_as_json(server):
+    pool = ConnectionPool(server.address)
+    try:
+        result = RemoteNode('stats', pool).compute(make_image())
+        assert result['shape'] == [32, 48, 3]
+    finally:
+        pool.close()
+
+
+def test_requests_are_pipelined_on_one_connection(server):
+    connection = NodeConnection(server.address, timeout=5)
+    try:
+        futures = [connection.submit('barrier', np.full((2, 2), value, dtype=np.uint8)) for value in range(4)]
+        results = [future.result(5) for future in futures]
+        assert [int(result[0, 0]) for result in results] == [0, 1, 2, 3]
+        assert connection.in_flight == 0
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize('node_id, message', [('missing', 'KeyError'), ('failing', 'ValueError: bad frame')])
+def test_remote_errors_propagate(server, node_id, message):
+    connection = NodeConnection(server.address, timeout=5)
+    try:
+        with pytest.raises(RemoteNodeError, match=message):
+            connection.submit(node_id, make_image()).result(5)
+    finally:
+        connection.close()
+
+
+def test_unencodable_request_leaves_nothing_pending(server):
+    connection = NodeConnection(server.address, timeout=5)
+    try:
+        with pytest.raises(TypeError):
+            connection.submit('echo', object(), CODECS['none'])
+        assert connection.in_flight == 0
+    finally:
+        connection.close()
+
+
+def test_pool_opens_at_most_size_connections(server):
+    pool = ConnectionPool(server.address, size=2)
+    try:
+        futures = [pool.submit('barrier', make_image(), RAW) for _ in range(4)]
+        assert all(future.result(5) is not None for future in futures)
+        assert len(pool._connections) == 2
+    finally:
+        pool.close()
+
+
+@pytest.mark.parametrize('compression', ['none', 'zlib', 'png', 'jpeg'])
+def test_frames_and_results_are_writable(server, compression):
+    pool = ConnectionPool(server.address)
+    try:
+        result = RemoteNode('draw', pool, compression=compression).compute(make_image())
+        assert result[0, 0].tolist() == [255, 255, 255]
+
+        result[1, 1] = 0
+        assert result.flags.writeable
+    finally:
+        pool.close()
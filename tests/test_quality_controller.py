@@ -0,0 +1,32 @@
+import pytest
+
+pytest.importorskip('cv2')
+
+from quality_controller import QualityController
+
+
+def test_level_change_reseeds_latency_estimate():
+    controller = QualityController(slo=0.1, degrade_after=2, restore_after=5)
+
+    controller.record(1.0)
+    controller.record(1.0)
+    assert controller.level == 1
+    assert controller.latency is None
+
+    # The slow samples from level 0 must not hold the new level over the SLO
+    controller.record(0.05)
+    controller.record(0.05)
+    assert controller.level == 1
+    assert controller.latency == pytest.approx(0.05)
+
+
+def test_restore_after_headroom():
+    controller = QualityController(slo=0.1, degrade_after=1, restore_after=2)
+
+    controller.record(1.0)
+    assert controller.level == 1
+
+    controller.record(0.01)
+    controller.record(0.01)
+    assert controller.level == 0
+    assert controller.metrics()['counters']['restore'] == 1
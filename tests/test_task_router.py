@@ -0,0 +1,97 @@
+import time
+
+import pytest
+
+from task_router import DeadlineExceeded, ProcessBackend, TaskRouter, local_backend
+
+
+class SleepNode:
+    def __init__(self, id, seconds, result=None):
+        self.id = id
+        self.seconds = seconds
+        self.result = result
+
+    def compute(self, image):
+        time.sleep(self.seconds)
+        return self.result if self.result is not None else image
+
+
+def test_idle_worker_steals_from_worker_overrunning_its_estimate():
+    with TaskRouter([local_backend, local_backend], default_latency=0.01) as router:
+        slow = router.submit(SleepNode("slow", 1.0), 0)
+        time.sleep(0.05)
+
+        start = time.monotonic()
+        fast = [router.submit(SleepNode("fast", 0.01), index) for index in range(6)]
+        results = [future.result(timeout=5) for future in fast]
+        elapsed = time.monotonic() - start
+
+        assert results == list(range(6))
+        assert not slow.done()
+        assert elapsed < 0.5
+        assert router.stats()['worker-1']['completed'] == 6
+        slow.result(timeout=5)
+
+
+def test_priorities_order_tasks_within_a_worker():
+    order = []
+
+    def backend(node, image):
+        order.append(image)
+        return node.compute(image)
+
+    with TaskRouter([backend]) as router:
+        blocker = router.submit(SleepNode("block", 0.1), 'block')
+        time.sleep(0.02)
+        futures = [router.submit(SleepNode("task", 0), name, priority=priority)
+                   for name, priority in [('low', 5), ('high', 0), ('mid', 2)]]
+        for future in [blocker] + futures:
+            future.result(timeout=5)
+
+    assert order == ['block', 'high', 'mid', 'low']
+
+
+def test_task_missing_its_deadline_fails():
+    with TaskRouter([local_backend]) as router:
+        router.submit(SleepNode("block", 0.1), 0)
+        late = router.submit(SleepNode("task", 0), 1, deadline=time.monotonic() + 0.01)
+
+        with pytest.raises(DeadlineExceeded):
+            late.result(timeout=5)
+
+
+def test_backend_errors_propagate_to_the_future():
+    class FailingNode:
+        id = "fail"
+
+        def compute(self, image):
+            raise ValueError("boom")
+
+    with TaskRouter([local_backend]) as router:
+        with pytest.raises(ValueError, match="boom"):
+            router.submit(FailingNode(), 0).result(timeout=5)
+
+
+class ClosingBackend:
+    def __init__(self):
+        self.closed = 0
+
+    def __call__(self, node, image):
+        return node.compute(image)
+
+    def close(self):
+        self.closed += 1
+
+
+def test_close_closes_backends():
+    backend = ClosingBackend()
+    process_backend = ProcessBackend()
+    router = TaskRouter([backend, process_backend, local_backend])
+    assert router.submit(SleepNode("fast", 0.0), 1).result(timeout=5) == 1
+
+    router.close()
+    router.close()
+
+    assert backend.closed == 1
+    with pytest.raises(RuntimeError):
+        process_backend.executor.submit(abs, -1)
@@ -0,0 +1,45 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+
+from video_source import VideoSource
+
+
+@pytest.fixture
+def video_path(tmp_path):
+    path = str(tmp_path / 'clip.avi')
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*'MJPG'), 10.0, (32, 24))
+    if not writer.isOpened():
+        pytest.skip("No MJPG video writer available.")
+    for value in range(0, 240, 40):
+        writer.write(np.full((24, 32, 3), value, dtype=np.uint8))
+    writer.release()
+    return path
+
+
+def test_reads_every_frame(video_path):
+    with VideoSource(video_path, buffer_size=2) as source:
+        means = [int(round(frame.mean() / 40)) for frame in source]
+    assert means == [0, 1, 2, 3, 4, 5]
+    assert source.stats()['decoded'] == 6
+
+
+def test_stride_skips_frames(video_path):
+    with VideoSource(video_path, stride=2) as source:
+        assert sum(1 for _ in source) == 3
+    assert source.stats()['skipped'] == 3
+
+
+def test_iterating_again_raises(video_path):
+    with VideoSource(video_path) as source:
+        assert sum(1 for _ in source) == 6
+        with pytest.raises(RuntimeError):
+            next(iter(source))
+
+
+def test_iterating_closed_source_raises(video_path):
+    source = VideoSource(video_path)
+    source.close()
+    with pytest.raises(RuntimeError):
+        next(iter(source))
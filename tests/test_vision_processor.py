@@ -0,0 +1,82 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+
+from vision_processor import VisionProcessor
+
+
+def make_frame(value=0, height=40, width=16):
+    return np.full((height, width, 3), value, dtype=np.uint8)
+
+
+def test_process_images_streams_results_in_order():
+    processor = VisionProcessor(num_threads=4)
+    results = processor.process_images((make_frame(value) for value in (10, 20, 30)), num_workers=2, prefetch=1)
+
+    assert not isinstance(results, list)
+    assert [round(result['mean'].real) for result in results] == [10, 20, 30]
+
+
+def test_process_images_bypasses_incremental_mode():
+    processor = VisionProcessor(num_threads=4, incremental=True)
+    results = list(processor.process_images([make_frame(10), make_frame(20)]))
+
+    assert [round(result['mean'].real) for result in results] == [10, 20]
+    assert processor._reference_frame is None
+    assert processor.last_dirty_tiles == []
+
+
+class CountingProcessor(VisionProcessor):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.computed = 0
+
+    def _process_tile(self, tile):
+        self.computed += 1
+        return super()._process_tile(tile)
+
+
+def test_incremental_recomputes_only_dirty_tiles():
+    processor = CountingProcessor(num_threads=4, incremental=True, refresh_interval=0)
+    frame = make_frame()
+
+    processor.process_frame(frame)
+    assert processor.last_dirty_tiles == [0, 1, 2, 3]
+
+    changed = frame.copy()
+    changed[10:20] = 100
+    processor.computed = 0
+    processor.process_frame(changed)
+    assert processor.last_dirty_tiles == [1]
+    assert processor.computed == 1
+
+    processor.computed = 0
+    processor.process_frame(changed)
+    assert processor.last_dirty_tiles == []
+    assert processor.computed == 0
+
+
+def test_incremental_refreshes_every_interval():
+    processor = CountingProcessor(num_threads=4, incremental=True, refresh_interval=3)
+    frame = make_frame()
+
+    dirty = []
+    for _ in range(7):
+        processor.process_frame(frame)
+        dirty.append(len(processor.last_dirty_tiles))
+
+    assert dirty == [4, 0, 0, 4, 0, 0, 4]
+    assert processor.computed == 12
+
+
+def test_incremental_resets_cache_on_shape_change():
+    processor = CountingProcessor(num_threads=4, incremental=True, refresh_interval=0)
+
+    processor.process_frame(make_frame())
+    processor.process_frame(make_frame())
+    assert processor.last_dirty_tiles == []
+
+    processor.process_frame(make_frame(height=80))
+    assert processor.last_dirty_tiles == [0, 1, 2, 3]
+    assert processor._reference_frame.shape == (80, 16, 3)
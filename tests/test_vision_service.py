@@ -0,0 +1,150 @@
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+
+from vision_service import InferenceService
+
+
+def encode(value):
+    image = np.full((4, 4, 3), value, dtype=np.uint8)
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+def mean(image):
+    return int(image.mean())
+
+
+def post(service, body):
+    host, port = service.address
+    request = urllib.request.Request(f"http://{host}:{port}/process", data=body, method='POST')
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+
+def get(service, path):
+    host, port = service.address
+    with urllib.request.urlopen(f"http://{host}:{port}{path}", timeout=5) as response:
+        return response.read().decode('utf-8')
+
+
+class BlockingHandler:
+    def __init__(self):
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, image):
+        self.started.set()
+        assert self.release.wait(5)
+        return mean(image)
+
+
+def test_process_returns_json_result():
+    with InferenceService(handler=mean) as service:
+        assert post(service, encode(7)) == 7
+
+
+def test_full_queue_is_rejected_with_503():
+    handler = BlockingHandler()
+    with InferenceService(handler=handler, max_queue=1) as service:
+        running = service.submit(encode(1))
+        assert handler.started.wait(5)
+        queued = service.submit(encode(2))
+
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(service, encode(3))
+        assert error.value.code == 503
+        assert error.value.headers['Retry-After'] == '1'
+
+        handler.release.set()
+        assert running.result(5) == 1
+        assert queued.result(5) == 2
+        assert service.metrics.counters['rejected'] == 1
+
+
+def test_identical_requests_are_coalesced():
+    handler = BlockingHandler()
+    with InferenceService(handler=handler) as service:
+        first = service.submit(encode(5))
+        second = service.submit(encode(5))
+        assert first is second
+
+        handler.release.set()
+        assert first.result(5) == 5
+        assert service.metrics.counters['coalesced'] == 1
+
+
+def test_concurrent_requests_are_micro_batched():
+    batch_sizes = []
+
+    def batch_handler(images):
+        batch_sizes.append(len(images))
+        return [mean(image) for image in images]
+
+    with InferenceService(batch_handler=batch_handler, max_batch_size=4, batch_timeout=0.5) as service:
+        futures = [service.submit(encode(value)) for value in (1, 2, 3)]
+        assert [future.result(5) for future in futures] == [1, 2, 3]
+
+    assert batch_sizes == [3]
+
+
+def test_batch_with_wrong_result_count_fails_every_request():
+    def batch_handler(images):
+        return [0]
+
+    with InferenceService(batch_handler=batch_handler, max_batch_size=4, batch_timeout=0.5) as service:
+        futures = [service.submit(encode(value)) for value in (1, 2, 3)]
+        for future in futures:
+            with pytest.raises(ValueError):
+                future.result(5)
+
+
+def test_metrics_endpoint():
+    with InferenceService(handler=mean) as service:
+        post(service, encode(1))
+        metrics = get(service, '/metrics')
+
+    assert 'vision_service_requests_total 1' in metrics
+    assert 'vision_service_completed_total 1' in metrics
+    assert 'vision_service_latency_seconds{quantile="0.5"}' in metrics
+
+
+def test_empty_body_is_rejected_without_wedging_the_service():
+    with InferenceService(handler=mean) as service:
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(service, b'')
+        assert error.value.code == 400
+
+        assert post(service, encode(4)) == 4
+
+
+def test_undecodable_body_fails_only_its_request():
+    with InferenceService(handler=mean) as service:
+        with pytest.raises(ValueError):
+            service.submit(b'').result(5)
+        with pytest.raises(urllib.error.HTTPError) as error:
+            post(service, b'not an image')
+        assert error.value.code == 500
+
+        # The dispatcher survived and nothing stale is left to coalesce onto
+        assert post(service, encode(6)) == 6
+        assert not service._in_flight
+
+
+def test_handler_failure_fails_only_its_request_in_a_batch():
+    def handler(image):
+        if mean(image) == 2:
+            raise RuntimeError("bad image")
+        return mean(image)
+
+    with InferenceService(handler=handler, max_batch_size=4, batch_timeout=0.5) as service:
+        futures = [service.submit(encode(value)) for value in (1, 2, 3)]
+        assert futures[0].result(5) == 1
+        with pytest.raises(RuntimeError):
+            futures[1].result(5)
+        assert futures[2].result(5) == 3
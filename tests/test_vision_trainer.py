@@ -0,0 +1,55 @@
+import pytest
+
+torch = pytest.importorskip('torch')
+
+from checkpointing import CheckpointManager
+from vision_trainer import VisionTrainer
+
+
+def make_trainer(checkpoint_manager=None, seed=0):
+    torch.manual_seed(0)
+    dataset = torch.utils.data.TensorDataset(torch.randn(8, 4), torch.randint(0, 2, (8,)))
+    model = torch.nn.Linear(4, 2)
+    return VisionTrainer(model, dataset, dataset, batch_size=2, learning_rate=0.01,
+                         checkpoint_manager=checkpoint_manager, seed=seed)
+
+
+def test_train_counts_epochs_relative_to_current(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    trainer = make_trainer()
+
+    trainer.train(num_epochs=1)
+    trainer.train(num_epochs=2)
+
+    assert trainer.epoch == 3
+    assert trainer.step == 12
+
+
+def test_resume_finishes_interrupted_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    with CheckpointManager(str(tmp_path / 'checkpoints'), keep_last=100, every_steps=1) as manager:
+        make_trainer(manager, seed=7).train(num_epochs=3)
+        interrupted = next(
+            path for path in manager.checkpoints() if manager.load(path)['target_epoch'] is not None
+        )
+
+        trainer = make_trainer(manager, seed=99)
+        assert trainer.resume(interrupted)
+        assert trainer.seed == 7
+        assert trainer.target_epoch == 3
+        assert not manager.due(trainer.step)
+
+        trainer.train(num_epochs=1)
+
+    assert trainer.epoch == 3
+    assert trainer.step == 12
+    assert trainer.target_epoch is None
+
+
+def test_fresh_runs_default_to_different_seeds():
+    dataset = torch.utils.data.TensorDataset(torch.randn(8, 4), torch.randint(0, 2, (8,)))
+    seeds = {
+        VisionTrainer(torch.nn.Linear(4, 2), dataset, dataset, batch_size=2, learning_rate=0.01).seed
+        for _ in range(3)
+    }
+    assert len(seeds) > 1
@@ -0,0 +1,46 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+cv2 = pytest.importorskip('cv2')
+
+from utils.vision_utils import decode_images, iter_decode_images
+
+
+def encode(value):
+    image = np.full((8, 8, 3), value, dtype=np.uint8)
+    return cv2.imencode('.png', image)[1].tobytes()
+
+
+def test_decode_images_keeps_input_order():
+    images = decode_images([encode(value) for value in range(10)], num_workers=4)
+    assert [int(image[0, 0, 0]) for image in images] == list(range(10))
+
+
+def test_iter_decode_images_bounds_prefetch():
+    pulled = []
+
+    def sources():
+        for value in range(20):
+            pulled.append(value)
+            yield encode(value)
+
+    images = iter_decode_images(sources(), num_workers=2, prefetch=3)
+    assert int(next(images)[0, 0, 0]) == 0
+    assert len(pulled) == 3
+
+    assert [int(image[0, 0, 0]) for image in images] == list(range(1, 20))
+
+
+def test_decode_images_resizes_to_target_size():
+    images = decode_images([encode(1)], target_size=(4, 2))
+    assert images[0].shape == (2, 4, 3)
+
+
+def test_reduced_jpeg_decode_returns_rgb():
+    bgr = np.zeros((64, 64, 3), dtype=np.uint8)
+    bgr[..., 2] = 200
+    data = cv2.imencode('.jpg', bgr)[1].tobytes()
+
+    image = decode_images([data], target_size=(8, 8))[0]
+    assert image.shape == (8, 8, 3)
+    assert image[0, 0, 0] > 150 and image[0, 0, 2] < 50
@@ -0,0 +1,121 @@
+import pytest
+
+np = pytest.importorskip('numpy')
+pytest.importorskip('cv2')
+
+from task_router import TaskRouter, local_backend
+from utils.buffer_pool import BufferPool
+from zeuslightingadapter import OpenCVAdapter, ZeusEdge, ZeusNode, ZeusNodeGraph, ZeusProtocol
+
+
+class LegacyAdapter(ZeusProtocol):
+    """
+    An adapter written against the original process_node(self, image) signature.
+    """
+
+    def process_node(self, image):
+        return int(image.sum())
+
+    def process_edge(self, image):
+        return int(image.max())
+
+
+class DuckTypedNode:
+    def __init__(self, id):
+        self.id = id
+
+    def compute(self, image):
+        return image.shape
+
+
+def _image():
+    rng = np.random.default_rng(0)
+    return rng.integers(0, 256, size=(32, 48, 3), dtype=np.uint8)
+
+
+@pytest.mark.parametrize('pool', [None, BufferPool()])
+def test_legacy_adapters_and_duck_typed_nodes_still_work(pool):
+    image = _image()
+    node = ZeusNode("legacy", LegacyAdapter())
+    graph = ZeusNodeGraph(
+        [node, DuckTypedNode("duck")],
+        [ZeusEdge("edge", node, node, LegacyAdapter())],
+    )
+
+    results = graph.compute(image, pool=pool, skip_optional=True)
+
+    assert results == {"legacy": int(image.sum()), "duck": image.shape, "edge": int(image.max())}
+
+
+def test_pooled_outputs_match_unpooled_outputs():
+    image = _image()
+    node = ZeusNode("gray", OpenCVAdapter())
+    graph = ZeusNodeGraph([node], [ZeusEdge("edges", node, node, OpenCVAdapter())])
+
+    expected = graph.compute(image)
+    pooled = graph.compute(image, pool=BufferPool())
+
+    for key in expected:
+        np.testing.assert_array_equal(pooled[key], expected[key])
+
+
+def test_compute_stream_recycles_previous_frame_outputs():
+    pool = BufferPool()
+    node = ZeusNode("gray", OpenCVAdapter())
+    graph = ZeusNodeGraph([node], [])
+    frames = [_image() for _ in range(4)]
+
+    seen = [id(results["gray"]) for results in graph.compute_stream(frames, pool=pool)]
+
+    assert pool.hits == 3
+    assert len(set(seen)) < len(seen)
+
+
+class InvertAdapter(ZeusProtocol):
+    """
+    An adapter that writes the inverted image into a pooled buffer of the input's shape.
+    """
+
+    def process_node(self, image, out=None):
+        return np.subtract(255, image, out=out, dtype=np.uint8)
+
+    def node_output_spec(self, image):
+        return image.shape, image.dtype
+
+
+class PassthroughNode:
+    def __init__(self, id):
+        self.id = id
+
+    def compute(self, image):
+        return image
+
+
+def test_release_only_returns_leased_buffers():
+    pool = BufferPool()
+    graph = ZeusNodeGraph(
+        [ZeusNode("first", InvertAdapter()), PassthroughNode("passthrough"), ZeusNode("second", InvertAdapter())],
+        [],
+    )
+    frames = [_image() + value for value in range(6)]
+    originals = [frame.copy() for frame in frames]
+
+    for frame, results in zip(frames, graph.compute_stream(frames, pool=pool)):
+        assert results["passthrough"] is frame
+        np.testing.assert_array_equal(results["first"], 255 - frame)
+
+    for frame, original in zip(frames, originals):
+        np.testing.assert_array_equal(frame, original)
+
+
+def test_compute_through_router_matches_local_compute():
+    image = _image()
+    node = ZeusNode("legacy", LegacyAdapter())
+    optional = ZeusNode("optional", LegacyAdapter(), optional=True)
+    graph = ZeusNodeGraph([node, optional], [ZeusEdge("edge", node, node, LegacyAdapter())])
+
+    with TaskRouter([local_backend, local_backend]) as router:
+        routed = graph.compute(image, pool=BufferPool(), skip_optional=True, router=router)
+
+    assert routed == graph.compute(image, skip_optional=True)
+    assert set(routed) == {"legacy", "edge"}
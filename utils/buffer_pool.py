@@ -0,0 +1,74 @@
+import collections
+import threading
+
+import numpy as np
+
+
+class BufferPool:
+    """
+    A pool of reusable arrays keyed by shape and dtype.
+
+    Leasing a buffer returns a previously released array of the same shape and
+    dtype when one is available, so steady-state frame processing stops
+    allocating (and page-faulting) fresh output arrays. Leased buffers are not
+    zeroed.
+    """
+
+    def __init__(self, max_per_key=8):
+        """
+        Initializes a buffer pool.
+
+        Args:
+            max_per_key (int): The maximum number of idle buffers kept per shape and dtype.
+        """
+        self.max_per_key = max_per_key
+        self.hits = 0
+        self.misses = 0
+        self._free = collections.defaultdict(list)
+        self._lock = threading.Lock()
+
+    def lease(self, shape, dtype):
+        """
+        Take a buffer of the given shape and dtype from the pool.
+
+        Args:
+            shape (tuple): The shape of the buffer.
+            dtype (numpy.dtype): The dtype of the buffer.
+
+        Returns:
+            numpy.ndarray: An uninitialized buffer.
+        """
+        key = (tuple(shape), np.dtype(dtype).str)
+
+        with self._lock:
+            free = self._free.get(key)
+            if free:
+                self.hits += 1
+                return free.pop()
+            self.misses += 1
+
+        return np.empty(shape, dtype=dtype)
+
+    def release(self, buffer):
+        """
+        Return a buffer to the pool. The caller must not use it afterwards.
+
+        Args:
+            buffer (numpy.ndarray): A buffer previously leased from the pool.
+        """
+        if not isinstance(buffer, np.ndarray) or buffer.base is not None:
+            return
+
+        key = (buffer.shape, buffer.dtype.str)
+
+        with self._lock:
+            free = self._free[key]
+            if len(free) < self.max_per_key:
+                free.append(buffer)
+
+    def clear(self):
+        """
+        Drop every idle buffer.
+        """
+        with self._lock:
+            self._free.clear()
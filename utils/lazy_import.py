@@ -0,0 +1,71 @@
+import importlib
+import threading
+
+
+class LazyModule:
+    """
+    A module proxy that imports the real module on first attribute access.
+
+    Heavy backends such as torch, torchvision, cv2 and scikit-image are bound
+    through this proxy at module scope, so importing a Vision Network module
+    stays cheap and spawned worker processes only pay for the backends they use.
+    """
+
+    def __init__(self, name):
+        """
+        Initializes a lazy module proxy.
+
+        Args:
+            name (str): The fully qualified name of the module to import.
+        """
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+        self.__dict__['_lock'] = threading.Lock()
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f"<lazy module {self._name!r} ({state})>"
+
+    def __getattr__(self, attribute):
+        module = self._load()
+        try:
+            return getattr(module, attribute)
+        except AttributeError:
+            # Submodules that the package does not import eagerly, e.g. skimage.filters
+            submodule = f"{self._name}.{attribute}"
+            try:
+                return importlib.import_module(submodule)
+            except ModuleNotFoundError as error:
+                # Only a missing submodule means a missing attribute; keep broken dependencies visible
+                if error.name != submodule:
+                    raise
+                raise AttributeError(attribute) from None
+
+    def __setattr__(self, attribute, value):
+        setattr(self._load(), attribute, value)
+
+    def _load(self):
+        """
+        Import the module if it has not been imported yet.
+
+        Returns:
+            module: The real module.
+        """
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    self.__dict__['_module'] = importlib.import_module(self._name)
+        return self._module
+
+
+def lazy_import(name):
+    """
+    Bind a module without importing it until it is first used.
+
+    Args:
+        name (str): The fully qualified name of the module.
+
+    Returns:
+        LazyModule: A proxy for the module.
+    """
+    return LazyModule(name)
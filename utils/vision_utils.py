@@ -1,5 +1,12 @@
+import collections
+import concurrent.futures
+import os
+
 import numpy as np
-import cv2
+
+from utils.lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
 
 def resize_image(image, size):
     """
@@ -15,19 +22,193 @@ def resize_image(image, size):
     resized_image = cv2.resize(image, size)
     return resized_image
 
-def normalize_image(image):
+def normalize_image(image, out=None):
     """
     Normalize the input image by scaling pixel values to the range [0, 1].
 
     Args:
         image (numpy.ndarray): The input image.
+        out (numpy.ndarray): An optional float32 buffer of the same shape to write into.
 
     Returns:
         numpy.ndarray: The normalized image.
     """
+    if out is not None:
+        return np.multiply(image, np.float32(1.0 / 255.0), out=out)
+
     normalized_image = image.astype(np.float32) / 255.0
     return normalized_image
 
+def _imread_flags(factor):
+    """
+    Build the imdecode flags for a reduction factor.
+
+    Args:
+        factor (int): One of 1, 2, 4 or 8.
+
+    Returns:
+        tuple: The flags, and whether the decoder emits RGB directly.
+    """
+    flags = {
+        8: cv2.IMREAD_REDUCED_COLOR_8,
+        4: cv2.IMREAD_REDUCED_COLOR_4,
+        2: cv2.IMREAD_REDUCED_COLOR_2,
+        1: cv2.IMREAD_COLOR,
+    }[factor]
+
+    # OpenCV >= 4.11 can emit RGB straight out of the decoder. IMREAD_COLOR (BGR) and
+    # IMREAD_COLOR_RGB are mutually exclusive, so the BGR bit is swapped for the RGB one.
+    color_rgb = getattr(cv2, 'IMREAD_COLOR_RGB', None)
+    if color_rgb is None:
+        return flags, False
+    return (flags & ~cv2.IMREAD_COLOR) | color_rgb, True
+
+
+def _jpeg_size(data):
+    """
+    Read the dimensions of a JPEG image from its header without decoding it.
+
+    Args:
+        data (bytes): The encoded image.
+
+    Returns:
+        tuple: The (width, height) of the image, or None if it is not a JPEG.
+    """
+    if data[:2] != b'\xff\xd8':
+        return None
+
+    offset = 2
+    while offset + 9 < len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        length = int.from_bytes(data[offset + 2:offset + 4], 'big')
+        # SOF0-SOF15, excluding DHT (C4), JPG (C8) and DAC (CC)
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            height = int.from_bytes(data[offset + 5:offset + 7], 'big')
+            width = int.from_bytes(data[offset + 7:offset + 9], 'big')
+            return width, height
+        offset += 2 + length
+
+    return None
+
+
+def _reduction_factor(image_size, target_size):
+    """
+    Pick the largest JPEG reduction factor that keeps the image at least as large as the target.
+
+    Args:
+        image_size (tuple): The (width, height) of the encoded image.
+        target_size (tuple): The desired (width, height).
+
+    Returns:
+        int: One of 1, 2, 4 or 8.
+    """
+    width, height = image_size
+    target_width, target_height = target_size
+
+    for factor in (8, 4, 2):
+        if width // factor >= target_width and height // factor >= target_height:
+            return factor
+
+    return 1
+
+
+def decode_image(source, target_size=None):
+    """
+    Decode an image into an RGB array.
+
+    When `target_size` is given, JPEG inputs are decoded at a reduced resolution
+    (IMREAD_REDUCED_*) that is still at least as large as the target, and the
+    result is resized to exactly `target_size`.
+
+    Args:
+        source (str, bytes or numpy.ndarray): A file path, the encoded image bytes,
+            or an already decoded BGR image.
+        target_size (tuple): The desired size (width, height), or None to keep the
+            original resolution.
+
+    Returns:
+        numpy.ndarray: The decoded RGB image.
+    """
+    if isinstance(source, np.ndarray):
+        image = cv2.cvtColor(source, cv2.COLOR_BGR2RGB)
+    else:
+        if isinstance(source, str):
+            data = np.fromfile(source, dtype=np.uint8)
+        else:
+            data = np.frombuffer(source, dtype=np.uint8)
+
+        factor = 1
+        if target_size is not None:
+            image_size = _jpeg_size(data[:65536].tobytes())
+            if image_size is not None:
+                factor = _reduction_factor(image_size, target_size)
+
+        flags, decodes_rgb = _imread_flags(factor)
+        image = cv2.imdecode(data, flags)
+        if image is None:
+            raise ValueError(f"Unable to decode image {source if isinstance(source, str) else '<bytes>'}.")
+        if not decodes_rgb:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB, dst=image)
+
+    if target_size is not None and image.shape[1::-1] != tuple(target_size):
+        image = resize_image(image, tuple(target_size))
+
+    return image
+
+
+def iter_decode_images(sources, target_size=None, num_workers=None, prefetch=None):
+    """
+    Decode images in parallel worker threads, yielding them in input order.
+
+    OpenCV releases the GIL while decoding, so threads scale across cores. At most
+    `prefetch` images are decoded ahead of the consumer, so memory stays bounded
+    however many sources there are.
+
+    Args:
+        sources (iterable): File paths, encoded image bytes or decoded BGR images.
+        target_size (tuple): The desired size (width, height), or None to keep the
+            original resolution.
+        num_workers (int): The number of decoding threads.
+        prefetch (int): The maximum number of images decoded ahead of the consumer.
+            Defaults to twice the number of decoding threads.
+
+    Yields:
+        numpy.ndarray: The decoded RGB images, in input order.
+    """
+    if num_workers is None:
+        num_workers = min(32, (os.cpu_count() or 1) + 4)
+    if prefetch is None:
+        prefetch = 2 * num_workers
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=num_workers) as executor:
+        pending = collections.deque()
+        for source in sources:
+            pending.append(executor.submit(decode_image, source, target_size))
+            if len(pending) >= prefetch:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def decode_images(sources, target_size=None, num_workers=None):
+    """
+    Decode a batch of images in parallel worker threads.
+
+    Args:
+        sources (list): File paths, encoded image bytes or decoded BGR images.
+        target_size (tuple): The desired size (width, height), or None to keep the
+            original resolution.
+        num_workers (int): The number of decoding threads.
+
+    Returns:
+        List[numpy.ndarray]: The decoded RGB images, in input order.
+    """
+    return list(iter_decode_images(sources, target_size=target_size, num_workers=num_workers))
+
+
 class ImageVisualizer:
     """
     A utility class for visualizing images and their corresponding labels.
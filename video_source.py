@@ -0,0 +1,221 @@
+import queue
+import threading
+import time
+
+from utils.lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+
+_END = object()
+
+
+class VideoSource:
+    """
+    A threaded video frame iterator built on cv2.VideoCapture.
+
+    Frames are decoded on a background thread into a bounded ring of reusable
+    frame buffers so that decoding overlaps with downstream compute. A frame
+    yielded by the iterator stays valid until the next frame is requested; copy
+    it if it has to outlive the loop body. A source is read once: iterating it
+    again after it is exhausted or closed raises RuntimeError.
+    """
+
+    def __init__(self, source, buffer_size=4, stride=1, target_fps=None, drop_when_full=False):
+        """
+        Initializes a video source.
+
+        Args:
+            source (str or int): A video file path, stream URL or camera index.
+            buffer_size (int): The number of frame buffers in the ring.
+            stride (int): Keep one frame out of every `stride` frames.
+            target_fps (float): The desired output frame rate. When set, the stride
+                is derived from the source frame rate and `stride` is ignored.
+            drop_when_full (bool): Drop frames instead of waiting when every buffer
+                is in use. Useful for live cameras where stale frames are useless.
+        """
+        if buffer_size < 2:
+            raise ValueError("buffer_size must be at least 2.")
+        if stride < 1:
+            raise ValueError("stride must be a positive integer.")
+
+        self.source = source
+        self.buffer_size = buffer_size
+        self.stride = stride
+        self.target_fps = target_fps
+        self.drop_when_full = drop_when_full
+
+        self._buffers = [None] * buffer_size
+        self._free = queue.Queue()
+        self._ready = queue.Queue()
+        self._stop = threading.Event()
+        self._thread = None
+        self._current = None
+        self._error = None
+        self._exhausted = False
+
+        self._decoded = 0
+        self._skipped = 0
+        self._dropped = 0
+        self._started_at = None
+        self._finished_at = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __iter__(self):
+        if self._exhausted or self._stop.is_set():
+            raise RuntimeError("VideoSource has already been read; create a new one to read it again.")
+
+        self.start()
+        while True:
+            self._release_current()
+            index = self._ready.get()
+            if index is _END:
+                self._exhausted = True
+                break
+            self._current = index
+            yield self._buffers[index]
+
+        if self._error is not None:
+            raise self._error
+
+    def start(self):
+        """
+        Start the background decode thread if it is not already running.
+        """
+        if self._thread is not None:
+            return
+
+        for index in range(self.buffer_size):
+            self._free.put(index)
+
+        self._thread = threading.Thread(target=self._decode_loop, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        """
+        Stop the background decode thread and release the capture device.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._release_current()
+            self._thread.join()
+
+    def stats(self):
+        """
+        Report decode statistics.
+
+        Returns:
+            dict: The number of decoded, skipped and dropped frames and the decode fps.
+        """
+        end = self._finished_at or time.perf_counter()
+        elapsed = end - self._started_at if self._started_at else 0.0
+        decode_fps = self._decoded / elapsed if elapsed > 0 else 0.0
+
+        return {
+            'decoded': self._decoded,
+            'skipped': self._skipped,
+            'dropped': self._dropped,
+            'decode_fps': decode_fps,
+        }
+
+    def _release_current(self):
+        """
+        Return the buffer of the last yielded frame to the free ring.
+        """
+        if self._current is not None:
+            self._free.put(self._current)
+            self._current = None
+
+    def _resolve_stride(self, capture):
+        """
+        Compute the frame stride from the target fps and the source fps.
+
+        Args:
+            capture (cv2.VideoCapture): The opened capture.
+
+        Returns:
+            int: The number of source frames per kept frame.
+        """
+        if self.target_fps is None:
+            return self.stride
+
+        source_fps = capture.get(cv2.CAP_PROP_FPS)
+        if source_fps <= 0:
+            return self.stride
+
+        return max(1, int(round(source_fps / self.target_fps)))
+
+    def _acquire_buffer(self):
+        """
+        Take a free buffer index from the ring.
+
+        Returns:
+            int: The buffer index, or None if no buffer is available or the source
+            is being closed.
+        """
+        if self.drop_when_full:
+            try:
+                return self._free.get_nowait()
+            except queue.Empty:
+                return None
+
+        while not self._stop.is_set():
+            try:
+                return self._free.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+        return None
+
+    def _decode_loop(self):
+        """
+        Grab and decode frames into the ring until the source is exhausted or closed.
+        """
+        capture = cv2.VideoCapture(self.source)
+        self._started_at = time.perf_counter()
+
+        try:
+            if not capture.isOpened():
+                raise IOError(f"Unable to open video source {self.source!r}.")
+
+            stride = self._resolve_stride(capture)
+            position = 0
+
+            while not self._stop.is_set():
+                # With the FFmpeg backend grab() already decodes the frame; retrieve()
+                # only converts and copies it, which skipped and dropped frames avoid.
+                if not capture.grab():
+                    break
+
+                keep = position % stride == 0
+                position += 1
+                if not keep:
+                    self._skipped += 1
+                    continue
+
+                index = self._acquire_buffer()
+                if index is None:
+                    if self._stop.is_set():
+                        break
+                    self._dropped += 1
+                    continue
+
+                ok, frame = capture.retrieve(self._buffers[index])
+                if not ok:
+                    self._free.put(index)
+                    break
+
+                self._buffers[index] = frame
+                self._decoded += 1
+                self._ready.put(index)
+        except Exception as error:
+            self._error = error
+        finally:
+            capture.release()
+            self._finished_at = time.perf_counter()
+            self._ready.put(_END)
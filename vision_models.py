@@ -1,6 +1,10 @@
 import torch
 import torch.nn as nn
-import torchvision.models as models
+
+from utils.lazy_import import lazy_import
+
+# torch is needed to define the nn.Module subclasses; torchvision only when a model is built
+models = lazy_import('torchvision.models')
 
 class VisionModel(nn.Module):
     """
@@ -36,21 +40,22 @@ class ResNetModel(VisionModel):
     A ResNet-based vision model with customizable depth and number of classes.
     """
 
-    def __init__(self, depth, num_classes):
+    def __init__(self, depth, num_classes, pretrained=True):
         self.depth = depth
+        self.pretrained = pretrained
         super(ResNetModel, self).__init__(num_classes)
 
     def _initialize_model(self):
         if self.depth == 18:
-            resnet = models.resnet18(pretrained=True)
+            resnet = models.resnet18(pretrained=self.pretrained)
         elif self.depth == 34:
-            resnet = models.resnet34(pretrained=True)
+            resnet = models.resnet34(pretrained=self.pretrained)
         elif self.depth == 50:
-            resnet = models.resnet50(pretrained=True)
+            resnet = models.resnet50(pretrained=self.pretrained)
         elif self.depth == 101:
-            resnet = models.resnet101(pretrained=True)
+            resnet = models.resnet101(pretrained=self.pretrained)
         elif self.depth == 152:
-            resnet = models.resnet152(pretrained=True)
+            resnet = models.resnet152(pretrained=self.pretrained)
         else:
             raise ValueError("Invalid ResNet depth specified.")
 
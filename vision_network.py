@@ -20,37 +20,53 @@ def vision_node(image_queue, result_queue):
         # Put the processed image in the result queue
         result_queue.put(processed_image)
 
-# Create shared queues for communication
-image_queue = mp.Queue()
-result_queue = mp.Queue()
-
-# Create and start multiple vision nodes as separate processes
-num_nodes = 4
-vision_nodes = []
-for _ in range(num_nodes):
-    node = mp.Process(target=vision_node, args=(image_queue, result_queue))
-    node.start()
-    vision_nodes.append(node)
-
-# Generate a list of images to process
-image_list = [...]  # List of input images
-
-# Distribute images to the vision nodes for processing
-for image in image_list:
-    image_queue.put(image)
-
-# Collect the processed images from the result queue
-processed_images = []
-for _ in range(len(image_list)):
-    processed_image = result_queue.get()
-    processed_images.append(processed_image)
-
-# Wait for all vision nodes to finish
-for node in vision_nodes:
-    node.terminate()
-    node.join()
-
-# Process the processed_images further if needed
+def run_vision_nodes(image_list, num_nodes=4):
+    """
+    Process images on a set of vision nodes running as separate processes.
+
+    Args:
+        image_list (list): The input images.
+        num_nodes (int): The number of vision node processes.
+
+    Returns:
+        list: The processed images.
+    """
+    # Create shared queues for communication
+    image_queue = mp.Queue()
+    result_queue = mp.Queue()
+
+    # Create and start multiple vision nodes as separate processes
+    vision_nodes = []
+    for _ in range(num_nodes):
+        node = mp.Process(target=vision_node, args=(image_queue, result_queue))
+        node.start()
+        vision_nodes.append(node)
+
+    # Distribute images to the vision nodes for processing
+    for image in image_list:
+        image_queue.put(image)
+
+    # Collect the processed images from the result queue
+    processed_images = []
+    for _ in range(len(image_list)):
+        processed_image = result_queue.get()
+        processed_images.append(processed_image)
+
+    # Wait for all vision nodes to finish
+    for node in vision_nodes:
+        node.terminate()
+        node.join()
+
+    return processed_images
+
+
+if __name__ == '__main__':
+    # Generate a list of images to process
+    image_list = []  # List of input images
+
+    processed_images = run_vision_nodes(image_list)
+    # Process the processed_images further if needed
+
 #n this analogy, the vision nodes represent individual workers that perform the computer vision operations on the images. They are created as separate processes using the multiprocessing module for parallel execution. The image_queue is a shared queue where the main program distributes the images to the vision nodes, and the result_queue is used to collect the processed images from the nodes.
 
 #The process_image function represents a computer vision task, such as object detection or image segmentation, that is performed on each image by the vision nodes. In this example, it is a placeholder function that simply passes through the original image.
@@ -1,13 +1,47 @@
 import numpy as np
-import cv2
+import concurrent.futures
+import time
+
+from utils.lazy_import import lazy_import
+from utils.vision_utils import iter_decode_images
+
+cv2 = lazy_import('cv2')
 
 class VisionProcessor:
     """
     A multithreaded vision processor for efficient and parallel execution of vision tasks.
     """
 
-    def __init__(self, num_threads):
+    def __init__(self, num_threads, incremental=False, diff_threshold=2.0, refresh_interval=30, buffer_pool=None):
+        """
+        Initializes a vision processor.
+
+        Args:
+            num_threads (int): The number of tiles to split each image into.
+            incremental (bool): Reuse cached tile results for tiles that did not change
+                since they were last computed. Intended for fixed-camera feeds.
+            diff_threshold (float): The mean absolute pixel difference above which a
+                tile is considered dirty in incremental mode.
+            refresh_interval (int): Recompute every tile once every `refresh_interval`
+                frames in incremental mode to bound drift. Use 0 to disable.
+            buffer_pool (BufferPool): Lease per-tile scratch buffers from this pool
+                instead of allocating them for every tile.
+        """
         self.num_threads = num_threads
+        self.buffer_pool = buffer_pool
+        self.incremental = incremental
+        self.diff_threshold = diff_threshold
+        self.refresh_interval = refresh_interval
+        self.last_dirty_tiles = []
+        self.reset()
+
+    def reset(self):
+        """
+        Drop the cached reference frame and tile results used by incremental mode.
+        """
+        self._reference_frame = None
+        self._tile_results = None
+        self._frames_since_refresh = 0
 
     def process_image(self, image_path):
         """
@@ -20,8 +54,67 @@ class VisionProcessor:
             dict: A dictionary containing the processed results.
         """
         image = cv2.imread(image_path)
+        return self.process_frame(image)
+
+    def process_frame(self, image):
+        """
+        Process a decoded BGR frame using multiple threads.
+
+        Args:
+            image (numpy.ndarray): The BGR frame, as returned by OpenCV.
+
+        Returns:
+            dict: A dictionary containing the processed results.
+        """
         image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+        return self._process_rgb(image)
+
+    def process_images(self, sources, target_size=None, num_workers=None, prefetch=None):
+        """
+        Decode and process a batch of images, yielding results as they are ready.
 
+        Decoding runs in parallel worker threads, at most `prefetch` images ahead of
+        processing, and uses reduced-resolution JPEG decoding when `target_size` is
+        known. The images are independent, so incremental mode is bypassed and its
+        cache is left untouched.
+
+        Args:
+            sources (iterable): File paths, encoded image bytes or decoded BGR images.
+            target_size (tuple): The size (width, height) to decode the images to.
+            num_workers (int): The number of decoding threads.
+            prefetch (int): The maximum number of images decoded ahead of processing.
+
+        Yields:
+            dict: The processed results of each image, in input order.
+        """
+        images = iter_decode_images(sources, target_size=target_size, num_workers=num_workers, prefetch=prefetch)
+        for image in images:
+            yield self._process_tiles(image)
+
+    def _process_rgb(self, image):
+        """
+        Process an RGB image using multiple threads.
+
+        Args:
+            image (numpy.ndarray): The RGB image.
+
+        Returns:
+            dict: A dictionary containing the processed results.
+        """
+        if self.incremental:
+            return self._process_frame_incremental(image)
+        return self._process_tiles(image)
+
+    def _process_tiles(self, image):
+        """
+        Process every tile of an RGB image, ignoring the incremental cache.
+
+        Args:
+            image (numpy.ndarray): The RGB image.
+
+        Returns:
+            dict: A dictionary containing the processed results.
+        """
         # Split the image into multiple tiles for parallel processing
         tiles = self._split_image_into_tiles(image, self.num_threads)
 
@@ -34,6 +127,92 @@ class VisionProcessor:
 
         return processed_results
 
+    def _process_frame_incremental(self, image):
+        """
+        Process an RGB frame, recomputing only the tiles that changed.
+
+        Each tile is compared with the pixels it had when its cached result was
+        computed, so slow gradual changes still accumulate into a recompute.
+
+        Args:
+            image (numpy.ndarray): The RGB frame.
+
+        Returns:
+            dict: A dictionary containing the processed results.
+        """
+        tiles = self._split_image_into_tiles(image, self.num_threads)
+
+        refresh_due = self.refresh_interval and self._frames_since_refresh >= self.refresh_interval
+        if self._reference_frame is None or self._reference_frame.shape != image.shape or refresh_due:
+            self._reference_frame = image.copy()
+            self._tile_results = [None] * len(tiles)
+            self._frames_since_refresh = 0
+            dirty_tiles = list(range(len(tiles)))
+        else:
+            dirty_tiles = self._find_dirty_tiles(image, len(tiles))
+
+        self._frames_since_refresh += 1
+        self.last_dirty_tiles = dirty_tiles
+
+        if dirty_tiles:
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                results = executor.map(self._process_tile, [tiles[index] for index in dirty_tiles])
+
+                for index, result in zip(dirty_tiles, results):
+                    self._tile_results[index] = result
+
+            # Only the recomputed rows move the reference forward
+            tile_height = image.shape[0] // len(tiles)
+            for index in dirty_tiles:
+                rows = slice(index * tile_height, (index + 1) * tile_height)
+                self._reference_frame[rows] = image[rows]
+
+        return self._merge_results(self._tile_results)
+
+    def _find_dirty_tiles(self, image, num_tiles):
+        """
+        Find the tiles whose mean absolute difference to the reference frame exceeds the threshold.
+
+        Args:
+            image (numpy.ndarray): The current RGB frame.
+            num_tiles (int): The number of tiles the frame is split into.
+
+        Returns:
+            List[int]: The indices of the dirty tiles.
+        """
+        tile_height = image.shape[0] // num_tiles
+        covered = num_tiles * tile_height
+
+        difference = cv2.absdiff(image[:covered], self._reference_frame[:covered])
+        tile_scores = difference.reshape(num_tiles, -1).mean(axis=1)
+
+        return np.flatnonzero(tile_scores > self.diff_threshold).tolist()
+
+    def process_video(self, source, controller=None):
+        """
+        Process every frame produced by a video source.
+
+        Args:
+            source (VideoSource): The video source to read frames from.
+            controller (QualityController): Drop frames and lower the resolution as
+                needed to keep per-frame latency within its SLO.
+
+        Yields:
+            dict: A dictionary containing the processed results of each processed frame.
+        """
+        for frame in source:
+            if controller is None:
+                yield self.process_frame(frame)
+                continue
+
+            if not controller.admit():
+                continue
+
+            start = time.perf_counter()
+            results = self.process_frame(controller.prepare(frame))
+            controller.record(time.perf_counter() - start)
+            yield results
+
     def _split_image_into_tiles(self, image, num_tiles):
         """
         Split the image into multiple tiles.
@@ -69,7 +248,14 @@ class VisionProcessor:
         """
         # Perform vision processing tasks on the tile
         # Example: Perform outlier detection using an improved outlier detection algorithm
-        processed_tile = improved_outlier_detection(tile)
+        if self.buffer_pool is None:
+            return improved_outlier_detection(tile)
+
+        scratch = self.buffer_pool.lease(tile.shape, np.complex64)
+        try:
+            processed_tile = improved_outlier_detection(tile, out=scratch)
+        finally:
+            self.buffer_pool.release(scratch)
 
         return processed_tile
 
@@ -91,18 +277,23 @@ class VisionProcessor:
 
         return merged_results
 
-def improved_outlier_detection(image):
+def improved_outlier_detection(image, out=None):
     """
     Perform improved outlier detection on the image using complex mathematical operations.
 
     Args:
         image (numpy.ndarray): The input image.
+        out (numpy.ndarray): An optional complex64 scratch buffer of the same shape.
 
     Returns:
         dict: A dictionary containing the outlier detection results.
     """
     # Calculate the mean and standard deviation of the image using complex numbers
-    complex_image = image.astype(np.complex64)
+    if out is not None:
+        np.copyto(out, image)
+        complex_image = out
+    else:
+        complex_image = image.astype(np.complex64)
     mean = np.mean(complex_image)
     std = np.std(complex_image)
 
@@ -0,0 +1,370 @@
+import collections
+import concurrent.futures
+import hashlib
+import json
+import queue
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+from ZeusVisionProtocol import MyVisionLibrary
+from utils.lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+
+
+class ServiceOverloaded(RuntimeError):
+    """
+    Raised when a request is rejected by admission control.
+    """
+
+
+def _to_json(value):
+    """
+    Convert numpy and complex values in a result to JSON-serializable types.
+    """
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, complex):
+        return [value.real, value.imag]
+    return str(value)
+
+
+class ServiceMetrics:
+    """
+    Thread-safe counters and a sliding window of request latencies.
+    """
+
+    def __init__(self, window=1024):
+        self.started_at = time.monotonic()
+        self.latencies = collections.deque(maxlen=window)
+        self.counters = collections.Counter()
+        self._lock = threading.Lock()
+
+    def increment(self, name, count=1):
+        """
+        Increment a named counter.
+        """
+        with self._lock:
+            self.counters[name] += count
+
+    def observe(self, latency):
+        """
+        Record the latency of a completed request, in seconds.
+        """
+        with self._lock:
+            self.counters['completed'] += 1
+            self.latencies.append(latency)
+
+    def render(self):
+        """
+        Render the metrics in the Prometheus text format.
+
+        Returns:
+            str: The metrics text.
+        """
+        with self._lock:
+            counters = dict(self.counters)
+            latencies = np.array(self.latencies, dtype=np.float64)
+
+        uptime = time.monotonic() - self.started_at
+        lines = [
+            f"vision_service_uptime_seconds {uptime:.3f}",
+            f"vision_service_throughput_rps {counters.get('completed', 0) / uptime if uptime > 0 else 0.0:.3f}",
+        ]
+        for name in ('requests', 'completed', 'failed', 'rejected', 'coalesced', 'batches'):
+            lines.append(f"vision_service_{name}_total {counters.get(name, 0)}")
+        for quantile in (0.5, 0.9, 0.99):
+            value = np.quantile(latencies, quantile) if latencies.size else 0.0
+            lines.append(f'vision_service_latency_seconds{{quantile="{quantile}"}} {value:.6f}')
+
+        return "\n".join(lines) + "\n"
+
+
+class InferenceService:
+    """
+    Serves MyVisionLibrary.process_image over HTTP.
+
+    Requests are admitted into a bounded queue and rejected with 503 as soon as
+    it is full, identical in-flight requests share one computation, and
+    concurrent requests can be micro-batched into a single call.
+
+    Endpoints:
+        POST /process: The body is an encoded image; the response is the JSON result.
+        GET /metrics: Throughput, counters and latency percentiles.
+    """
+
+    def __init__(self, handler=None, batch_handler=None, host='127.0.0.1', port=0,
+                 max_queue=64, max_batch_size=1, batch_timeout=0.005, num_workers=1):
+        """
+        Initializes an inference service.
+
+        Args:
+            handler (callable): Computes the result of one decoded image. Defaults to
+                `MyVisionLibrary().process_image`.
+            batch_handler (callable): Computes a list of results from a list of images in
+                one graph or model call. Used when `max_batch_size` is greater than 1.
+            host (str): The interface to bind to.
+            port (int): The port to bind to, or 0 for an ephemeral port.
+            max_queue (int): The maximum number of queued requests before new ones are rejected.
+            max_batch_size (int): The maximum number of requests per call.
+            batch_timeout (float): How long to wait for more requests to fill a batch, in seconds.
+            num_workers (int): The number of dispatcher threads.
+        """
+        self.handler = handler or MyVisionLibrary().process_image
+        self.batch_handler = batch_handler
+        self.max_batch_size = max_batch_size
+        self.batch_timeout = batch_timeout
+        self.metrics = ServiceMetrics()
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._in_flight = {}
+        self._in_flight_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._dispatchers = [threading.Thread(target=self._dispatch, daemon=True) for _ in range(num_workers)]
+        self._server = ThreadingHTTPServer((host, port), self._make_request_handler())
+        self._server.daemon_threads = True
+        self._server_thread = None
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def address(self):
+        """
+        The (host, port) the service is listening on.
+        """
+        return self._server.server_address[:2]
+
+    def start(self):
+        """
+        Start the dispatcher threads and serve HTTP on a background thread.
+        """
+        for dispatcher in self._dispatchers:
+            dispatcher.start()
+        self._server_thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._server_thread.start()
+
+    def serve_forever(self):
+        """
+        Start the dispatcher threads and serve HTTP on the calling thread.
+        """
+        for dispatcher in self._dispatchers:
+            dispatcher.start()
+        self._server.serve_forever()
+
+    def close(self):
+        """
+        Stop serving and fail any requests still queued.
+        """
+        if self._server_thread is not None:
+            self._server.shutdown()
+            self._server_thread.join()
+        self._server.server_close()
+        self._stop.set()
+
+        while True:
+            try:
+                _, future = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            future.set_exception(ServiceOverloaded("Service is shutting down."))
+
+    def submit(self, body):
+        """
+        Admit an encoded image for processing, coalescing it with an identical in-flight request.
+
+        Args:
+            body (bytes): The encoded image.
+
+        Returns:
+            concurrent.futures.Future: A future resolving to the result.
+
+        Raises:
+            ServiceOverloaded: If the request queue is full.
+        """
+        self.metrics.increment('requests')
+        key = hashlib.blake2b(body, digest_size=16).digest()
+
+        with self._in_flight_lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.metrics.increment('coalesced')
+                return future
+
+            future = concurrent.futures.Future()
+            try:
+                self._queue.put_nowait((body, future))
+            except queue.Full:
+                self.metrics.increment('rejected')
+                raise ServiceOverloaded("Request queue is full.")
+            self._in_flight[key] = future
+
+        future.add_done_callback(lambda _: self._forget(key))
+        return future
+
+    def _forget(self, key):
+        """
+        Stop coalescing new requests onto a finished computation.
+        """
+        with self._in_flight_lock:
+            self._in_flight.pop(key, None)
+
+    def _next_batch(self):
+        """
+        Wait for a request, then gather more for up to `batch_timeout` seconds.
+
+        Returns:
+            list: The (body, future) pairs of the batch, or an empty list when stopping.
+        """
+        while not self._stop.is_set():
+            try:
+                batch = [self._queue.get(timeout=0.1)]
+                break
+            except queue.Empty:
+                continue
+        else:
+            return []
+
+        deadline = time.monotonic() + self.batch_timeout
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _dispatch(self):
+        """
+        Run queued requests through the handler until the service is closed.
+        """
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+
+            batch = [(body, future) for body, future in batch if future.set_running_or_notify_cancel()]
+            images = []
+            for body, future in batch:
+                # A bad body must only fail its own request, never the dispatcher thread
+                try:
+                    image = cv2.imdecode(np.frombuffer(body, dtype=np.uint8), cv2.IMREAD_COLOR)
+                except Exception:
+                    image = None
+                if image is None:
+                    future.set_exception(ValueError("Request body is not a decodable image."))
+                else:
+                    images.append((image, future))
+            if not images:
+                continue
+
+            self.metrics.increment('batches')
+            if self.batch_handler is not None and len(images) > 1:
+                self._run_batch(images)
+            else:
+                for image, future in images:
+                    self._run_one(image, future)
+
+    def _run_batch(self, images):
+        """
+        Compute a batch in one `batch_handler` call; a failure fails the whole batch.
+
+        Args:
+            images (list): The (image, future) pairs of the batch.
+        """
+        try:
+            results = list(self.batch_handler([image for image, _ in images]))
+            if len(results) != len(images):
+                raise ValueError(f"batch_handler returned {len(results)} results for {len(images)} images.")
+        except Exception as error:
+            for _, future in images:
+                future.set_exception(error)
+            return
+
+        for (_, future), result in zip(images, results):
+            future.set_result(result)
+
+    def _run_one(self, image, future):
+        """
+        Compute one request with `handler`, failing only that request on error.
+
+        Args:
+            image (numpy.ndarray): The decoded image.
+            future (concurrent.futures.Future): The future of the request.
+        """
+        try:
+            future.set_result(self.handler(image))
+        except Exception as error:
+            future.set_exception(error)
+
+    def _make_request_handler(self):
+        service = self
+
+        class RequestHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path != '/metrics':
+                    self._reply(404, b'Not found\n', 'text/plain')
+                    return
+                self._reply(200, service.metrics.render().encode('utf-8'), 'text/plain; version=0.0.4')
+
+            def do_POST(self):
+                if self.path != '/process':
+                    self._reply(404, b'Not found\n', 'text/plain')
+                    return
+
+                start = time.monotonic()
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if not body:
+                    self._reply(400, b'Request body is empty.\n', 'text/plain')
+                    return
+
+                try:
+                    result = service.submit(body).result()
+                except ServiceOverloaded as error:
+                    self._reply(503, f"{error}\n".encode('utf-8'), 'text/plain', {'Retry-After': '1'})
+                    return
+                except Exception as error:
+                    service.metrics.increment('failed')
+                    self._reply(500, f"{type(error).__name__}: {error}\n".encode('utf-8'), 'text/plain')
+                    return
+
+                service.metrics.observe(time.monotonic() - start)
+                self._reply(200, json.dumps(result, default=_to_json).encode('utf-8'), 'application/json')
+
+            def _reply(self, status, body, content_type, headers=None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return RequestHandler
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve MyVisionLibrary over HTTP.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-queue', type=int, default=64)
+    args = parser.parse_args()
+
+    InferenceService(host=args.host, port=args.port, max_queue=args.max_queue).serve_forever()
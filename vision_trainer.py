@@ -1,41 +1,64 @@
-import torch
-import torch.nn as nn
-import torch.optim as optim
-from torch.utils.data import DataLoader
-from torchvision.transforms import ToTensor
-from torchvision.datasets import CIFAR10
+import random
+
+from utils.lazy_import import lazy_import
+
+torch = lazy_import('torch')
+nn = lazy_import('torch.nn')
+optim = lazy_import('torch.optim')
+torch_data = lazy_import('torch.utils.data')
 
 class VisionTrainer:
     """
     A trainer class for training a vision network.
     """
 
-    def __init__(self, model, train_dataset, test_dataset, batch_size, learning_rate):
+    def __init__(self, model, train_dataset, test_dataset, batch_size, learning_rate, checkpoint_manager=None, seed=None,
+                 device=None):
         self.model = model
         self.train_dataset = train_dataset
         self.test_dataset = test_dataset
         self.batch_size = batch_size
         self.learning_rate = learning_rate
-
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
-        self.model.to(self.device)
+        self.checkpoint_manager = checkpoint_manager
+        # Each fresh run shuffles differently; the seed is checkpointed so a resume replays it
+        self.seed = seed if seed is not None else random.randrange(2 ** 31)
+
+        if device is None:
+            self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+            self.model.to(self.device)
+        else:
+            # The caller owns the model's placement, e.g. for shared registry models
+            self.device = torch.device(device)
+
+        self.optimizer = None
+        self.epoch = 0
+        self.batch_index = 0
+        self.step = 0
+        self.target_epoch = None
 
     def train(self, num_epochs):
         """
         Train the vision network for the specified number of epochs.
 
+        Each call trains `num_epochs` more epochs. After `resume` restores an
+        interrupted run, the call instead finishes that run from the restored epoch
+        and batch up to the epoch it was started for, and `num_epochs` is ignored.
+
         Args:
             num_epochs (int): The number of training epochs.
         """
-        train_loader = DataLoader(self.train_dataset, batch_size=self.batch_size, shuffle=True)
         criterion = nn.CrossEntropyLoss()
-        optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
+        optimizer = self._get_optimizer()
+
+        if self.target_epoch is None:
+            self.target_epoch = self.epoch + num_epochs
 
-        for epoch in range(num_epochs):
+        for epoch in range(self.epoch, self.target_epoch):
             self.model.train()
             total_loss = 0.0
+            num_batches = 0
 
-            for images, labels in train_loader:
+            for images, labels in self._make_train_loader(epoch, self.batch_index):
                 images = images.to(self.device)
                 labels = labels.to(self.device)
 
@@ -46,21 +69,117 @@ class VisionTrainer:
                 optimizer.step()
 
                 total_loss += loss.item()
+                num_batches += 1
+                self.batch_index += 1
+                self.step += 1
+
+                if self.checkpoint_manager is not None:
+                    self.checkpoint_manager.maybe_save(
+                        self.step, self.model, optimizer, epoch=epoch, batch_index=self.batch_index,
+                        target_epoch=self.target_epoch, seed=self.seed
+                    )
+
+            avg_loss = total_loss / max(num_batches, 1)
+
+            print(f"Epoch [{epoch + 1}/{self.target_epoch}], Average Loss: {avg_loss:.4f}")
+
+            self.epoch = epoch + 1
+            self.batch_index = 0
 
-            avg_loss = total_loss / len(train_loader)
+        # The run is complete, so resuming from here starts a new one
+        self.target_epoch = None
 
-            print(f"Epoch [{epoch + 1}/{num_epochs}], Average Loss: {avg_loss:.4f}")
+        if self.checkpoint_manager is not None:
+            self.checkpoint_manager.save(
+                self.step, self.model, optimizer, epoch=self.epoch, batch_index=0,
+                target_epoch=None, seed=self.seed
+            )
+            self.checkpoint_manager.wait()
 
         self.save_model()
 
-    def test(self):
+    def resume(self, path=None):
+        """
+        Restore the model, optimizer, epoch, data loader position and shuffle seed
+        from a checkpoint.
+
+        Args:
+            path (str): The checkpoint to restore. Defaults to the most recent one
+                written by the checkpoint manager.
+
+        Returns:
+            bool: True if a checkpoint was restored.
+        """
+        if self.checkpoint_manager is not None:
+            checkpoint = self.checkpoint_manager.load(path)
+        elif path is not None:
+            checkpoint = torch.load(path, map_location='cpu')
+        else:
+            raise ValueError("resume needs a checkpoint path or a checkpoint manager.")
+
+        if checkpoint is None:
+            return False
+
+        self.model.load_state_dict(checkpoint['model'])
+        self._get_optimizer().load_state_dict(checkpoint['optimizer'])
+        torch.set_rng_state(checkpoint['rng_state'])
+        self.epoch = checkpoint['epoch']
+        self.batch_index = checkpoint['batch_index']
+        self.step = checkpoint['step']
+        self.target_epoch = checkpoint.get('target_epoch')
+        self.seed = checkpoint.get('seed', self.seed)
+
+        if self.checkpoint_manager is not None:
+            self.checkpoint_manager.mark(self.step)
+        return True
+
+    def _get_optimizer(self):
+        """
+        Create the optimizer on first use so that `resume` can restore its state.
+        """
+        if self.optimizer is None:
+            self.optimizer = optim.Adam(self.model.parameters(), lr=self.learning_rate)
+        return self.optimizer
+
+    def _make_train_loader(self, epoch, start_batch=0):
+        """
+        Build the training data loader for an epoch, starting at a given batch.
+
+        The shuffle order is seeded per epoch so a resumed run sees the same batches,
+        and skipped batches are cut from the sampler instead of being loaded.
+
+        Args:
+            epoch (int): The epoch to build the loader for.
+            start_batch (int): The number of batches already trained in this epoch.
+
+        Returns:
+            DataLoader: The training data loader.
+        """
+        generator = torch.Generator()
+        generator.manual_seed(self.seed + epoch)
+        indices = torch.randperm(len(self.train_dataset), generator=generator).tolist()
+
+        return torch_data.DataLoader(
+            self.train_dataset, batch_size=self.batch_size, sampler=indices[start_batch * self.batch_size:]
+        )
+
+    def test(self, return_predictions=False):
         """
         Evaluate the trained model on the test dataset and compute accuracy.
+
+        Args:
+            return_predictions (bool): Also return the per-sample softmax confidences,
+                predicted classes and labels, e.g. to calibrate confidence thresholds.
+
+        Returns:
+            float or tuple: The accuracy in percent, or (accuracy, confidences,
+            predictions, labels) if `return_predictions` is set.
         """
         self.model.eval()
-        test_loader = DataLoader(self.test_dataset, batch_size=self.batch_size)
+        test_loader = torch_data.DataLoader(self.test_dataset, batch_size=self.batch_size)
         correct = 0
         total = 0
+        all_confidences, all_predictions, all_labels = [], [], []
 
         with torch.no_grad():
             for images, labels in test_loader:
@@ -73,9 +192,19 @@ class VisionTrainer:
                 total += labels.size(0)
                 correct += (predicted == labels).sum().item()
 
+                if return_predictions:
+                    confidences, _ = torch.softmax(outputs, dim=1).max(dim=1)
+                    all_confidences.append(confidences.cpu())
+                    all_predictions.append(predicted.cpu())
+                    all_labels.append(labels.cpu())
+
         accuracy = correct / total * 100
         print(f"Test Accuracy: {accuracy:.2f}%")
 
+        if return_predictions:
+            return accuracy, torch.cat(all_confidences), torch.cat(all_predictions), torch.cat(all_labels)
+        return accuracy
+
     def save_model(self):
         """
         Save the trained model.
@@ -83,13 +212,27 @@ class VisionTrainer:
         torch.save(self.model.state_dict(), "trained_model.pt")
 
 # Example usage
-train_dataset = CIFAR10(root="./data", train=True, transform=ToTensor(), download=True)
-test_dataset = CIFAR10(root="./data", train=False, transform=ToTensor(), download=True)
+def main():
+    from torchvision.transforms import ToTensor
+    from torchvision.datasets import CIFAR10
+
+    from checkpointing import CheckpointManager
+    from vision_models import ResNetModel
+
+    train_dataset = CIFAR10(root="./data", train=True, transform=ToTensor(), download=True)
+    test_dataset = CIFAR10(root="./data", train=False, transform=ToTensor(), download=True)
+
+    model = ResNetModel(depth=18, num_classes=10)  # Replace with your own vision model
+    with CheckpointManager("./checkpoints", keep_last=3, every_seconds=300) as checkpoint_manager:
+        trainer = VisionTrainer(model, train_dataset, test_dataset, batch_size=64, learning_rate=0.001,
+                                checkpoint_manager=checkpoint_manager)
+        trainer.resume()
+        trainer.train(num_epochs=10)
+    trainer.test()
+
 
-model = YourVisionModel()  # Replace with your own vision model
-trainer = VisionTrainer(model, train_dataset, test_dataset, batch_size=64, learning_rate=0.001)
-trainer.train(num_epochs=10)
-trainer.test()
+if __name__ == '__main__':
+    main()
 
 # In this example, the `VisionTrainer` class handles the training and evaluation of the vision network.
 # It takes in the model, training and test datasets, batch size, and learning rate as inputs.
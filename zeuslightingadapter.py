@@ -1,138 +1,295 @@
 import concurrent.futures
+import time
+
+import numpy as np
+
+from adapter_registry import create_adapter
+from utils.lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+skimage = lazy_import('skimage')
+
+class GraphResults(dict):
+    """
+    The results of a `ZeusNodeGraph.compute` call, keyed by node and edge ID.
+
+    It also records the output buffers leased from the pool for this call, so
+    that `ZeusNodeGraph.release` only returns buffers the graph owns and never,
+    say, an input frame that a passthrough node returned as its result.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.leased = []
+
 
 class ZeusNodeGraph:
-    """
-    Represents a Zeus network Zeus node graph.
-    """
-
-    def __init__(self, nodes, edges):
-        """
-        Initializes a Zeus network Zeus node graph.
-
-        Args:
-            nodes (list): A list of Zeus network nodes.
-            edges (list): A list of Zeus network edges.
-        """
-        self.nodes = nodes
-        self.edges = edges
-
-    def __repr__(self):
-        """
-        Returns a string representation of the Zeus network Zeus node graph.
-        """
-        return f"ZeusNodeGraph(nodes={self.nodes}, edges={self.edges})"
-
-    def draw(self, image):
-        """
-        Draws the Zeus network Zeus node graph on the image.
-
-        Args:
-            image (numpy.ndarray): The image to draw the Zeus network Zeus node graph on.
-        """
-        for node in self.nodes:
-            node.draw(image)
-
-        for edge in self.edges:
-            edge.draw(image)
-
-    def compute(self, image):
-        """
-        Computes the general purpose vision compute on the Zeus network Zeus node graph.
-
-        Args:
-            image (numpy.ndarray): The image to compute the general purpose vision compute on.
-
-        Returns:
-            dict: A dictionary containing the general purpose vision compute results.
-        """
-        results = {}
-
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            # Create a list of futures for parallel processing
-            node_futures = {executor.submit(node.compute, image): node for node in self.nodes}
-            edge_futures = {executor.submit(edge.compute, image): edge for edge in self.edges}
-
-            # Process node computations
-            for future in concurrent.futures.as_completed(node_futures):
-                node = node_futures[future]
-                results[node.id] = future.result()
-
-            # Process edge computations
-            for future in concurrent.futures.as_completed(edge_futures):
-                edge = edge_futures[future]
-                results[edge.id] = future.result()
-
-        return results
+    """
+    Represents a Zeus network Zeus node graph.
+    """
+
+    def __init__(self, nodes, edges):
+        """
+        Initializes a Zeus network Zeus node graph.
+
+        Args:
+            nodes (list): A list of Zeus network nodes.
+            edges (list): A list of Zeus network edges.
+        """
+        self.nodes = nodes
+        self.edges = edges
+
+    def __repr__(self):
+        """
+        Returns a string representation of the Zeus network Zeus node graph.
+        """
+        return f"ZeusNodeGraph(nodes={self.nodes}, edges={self.edges})"
+
+    def draw(self, image):
+        """
+        Draws the Zeus network Zeus node graph on the image.
+
+        Args:
+            image (numpy.ndarray): The image to draw the Zeus network Zeus node graph on.
+        """
+        for node in self.nodes:
+            node.draw(image)
+
+        for edge in self.edges:
+            edge.draw(image)
+
+    def compute(self, image, pool=None, skip_optional=False, router=None):
+        """
+        Computes the general purpose vision compute on the Zeus network Zeus node graph.
+
+        Args:
+            image (numpy.ndarray): The image to compute the general purpose vision compute on.
+            pool (BufferPool): Lease node and edge outputs from this pool instead of
+                allocating them. Hand the results back with `release` once consumed.
+            skip_optional (bool): Skip nodes and edges marked as optional.
+            router (TaskRouter): Route node and edge computations through a load-aware
+                router instead of a local thread pool. Routed work may run in another
+                process or on another host, so no outputs are leased from `pool`.
+
+        Returns:
+            GraphResults: A dictionary containing the general purpose vision compute results.
+        """
+        results = GraphResults()
+        nodes = [node for node in self.nodes if not (skip_optional and getattr(node, 'optional', False))]
+        edges = [edge for edge in self.edges if not (skip_optional and getattr(edge, 'optional', False))]
+
+        if router is not None:
+            futures = {item.id: router.submit(item, image) for item in nodes + edges}
+            results.update((item_id, future.result()) for item_id, future in futures.items())
+            return results
+
+        try:
+            with concurrent.futures.ThreadPoolExecutor() as executor:
+                # Create a list of futures for parallel processing
+                node_futures = {self._submit(executor, node, image, pool, results.leased): node for node in nodes}
+                edge_futures = {self._submit(executor, edge, image, pool, results.leased): edge for edge in edges}
+
+                # Process node computations
+                for future in concurrent.futures.as_completed(node_futures):
+                    node = node_futures[future]
+                    results[node.id] = future.result()
+
+                # Process edge computations
+                for future in concurrent.futures.as_completed(edge_futures):
+                    edge = edge_futures[future]
+                    results[edge.id] = future.result()
+        except BaseException:
+            if pool is not None:
+                self.release(results, pool)
+            raise
+
+        return results
+
+    def compute_stream(self, source, pool=None, controller=None, router=None):
+        """
+        Computes the general purpose vision compute on every frame of a video source.
+
+        With a pool, the results of a frame are recycled when the next frame is
+        requested, so they must not be kept beyond the loop body.
+
+        Args:
+            source (VideoSource): The video source to read frames from.
+            pool (BufferPool): The pool to lease per-frame outputs from.
+            controller (QualityController): Drop frames, lower the resolution and skip
+                optional nodes as needed to keep per-frame latency within its SLO.
+            router (TaskRouter): Route node and edge computations through a load-aware router.
+
+        Yields:
+            dict: A dictionary containing the general purpose vision compute results of each processed frame.
+        """
+        results = None
+        for frame in source:
+            if controller is not None and not controller.admit():
+                continue
+            if results is not None and pool is not None:
+                self.release(results, pool)
+
+            if controller is None:
+                results = self.compute(frame, pool=pool, router=router)
+            else:
+                start = time.perf_counter()
+                results = self.compute(
+                    controller.prepare(frame), pool=pool, skip_optional=controller.skip_optional, router=router
+                )
+                controller.record(time.perf_counter() - start)
+
+            yield results
+
+    def release(self, results, pool):
+        """
+        Returns the output buffers leased by a `compute` call to the buffer pool.
+
+        Only buffers the graph leased are returned; results the nodes produced
+        themselves, such as a passed-through input frame, are left alone.
+
+        Args:
+            results (GraphResults): The results returned by `compute`.
+            pool (BufferPool): The pool the outputs were leased from.
+        """
+        leased, results.leased = results.leased, []
+        for buffer in leased:
+            pool.release(buffer)
+
+    def _submit(self, executor, item, image, pool, leased):
+        """
+        Submit a node or edge computation, passing an output buffer only when one was leased.
+
+        Args:
+            executor (concurrent.futures.Executor): The executor to submit to.
+            item (ZeusNode or ZeusEdge): The node or edge to compute.
+            image (numpy.ndarray): The image to compute on.
+            pool (BufferPool): The pool to lease from, or None.
+            leased (list): Collects the leased buffer, if any.
+
+        Returns:
+            concurrent.futures.Future: The future of the computation.
+        """
+        out = self._lease_output(item, image, pool)
+        if out is None:
+            return executor.submit(item.compute, image)
+        leased.append(out)
+        return executor.submit(item.compute, image, out=out)
+
+    def _lease_output(self, item, image, pool):
+        """
+        Lease an output buffer for a node or edge, if its adapter can write into one.
+
+        Args:
+            item (ZeusNode or ZeusEdge): The node or edge about to be computed.
+            image (numpy.ndarray): The image it will be computed on.
+            pool (BufferPool): The pool to lease from, or None.
+
+        Returns:
+            numpy.ndarray: The leased buffer, or None.
+        """
+        if pool is None:
+            return None
+
+        output_spec = getattr(item, 'output_spec', None)
+        spec = output_spec(image) if output_spec is not None else None
+        if spec is None:
+            return None
+
+        return pool.lease(*spec)
 
 
 class ZeusNode:
-    """
-    Represents a Zeus node in the Zeus network.
-    """
+    """
+    Represents a Zeus node in the Zeus network.
+    """
+
+    def __init__(self, id, adapter, optional=False):
+        """
+        Initializes a Zeus node.
 
-    def __init__(self, id, adapter):
-        """
-        Initializes a Zeus node.
+        Args:
+            id (str): The ID of the Zeus node.
+            adapter (ZeusProtocol): The adapter for the vision library.
+            optional (bool): Whether the node is low priority and may be skipped under load.
+        """
+        self.id = id
+        self.adapter = adapter
+        self.optional = optional
 
-        Args:
-            id (str): The ID of the Zeus node.
-            adapter (ZeusProtocol): The adapter for the vision library.
-        """
-        self.id = id
-        self.adapter = adapter
+    def compute(self, image, out=None):
+        """
+        Performs a vision computation on the image for the Zeus node.
 
-    def compute(self, image):
-        """
-        Performs a vision computation on the image for the Zeus node.
+        Args:
+            image (numpy.ndarray): The image to perform the vision computation on.
+            out (numpy.ndarray): An optional buffer to write the result into.
 
-        Args:
-            image (numpy.ndarray): The image to perform the vision computation on.
+        Returns:
+            str: The result of the vision computation for the Zeus node.
+        """
+        if out is None:
+            return self.adapter.process_node(image)
+        return self.adapter.process_node(image, out=out)
 
-        Returns:
-            str: The result of the vision computation for the Zeus node.
-        """
-        return self.adapter.process_node(image)
+    def output_spec(self, image):
+        """
+        Returns the (shape, dtype) of the node result for the image, or None if unknown.
+        """
+        output_spec = getattr(self.adapter, 'node_output_spec', None)
+        return output_spec(image) if output_spec is not None else None
 
-    def draw(self, image):
-        """
-        Draws the Zeus node on the image.
+    def draw(self, image):
+        """
+        Draws the Zeus node on the image.
 
-        Args:
-            image (numpy.ndarray): The image to draw the Zeus node on.
-        """
-        self.adapter.draw_node(image)
+        Args:
+            image (numpy.ndarray): The image to draw the Zeus node on.
+        """
+        self.adapter.draw_node(image)
 
 
 class ZeusEdge:
-    """
-    Represents an edge in the Zeus network.
-    """
-
-    def __init__(self, id, source, destination, adapter):
-        """
-        Initializes a Zeus edge.
-
-        Args:
-            id (str): The ID of the Zeus edge.
-            source (ZeusNode): The source node of the edge.
-            destination (ZeusNode): The destination node of the edge.
-            adapter (ZeusProtocol): The adapter for the vision library.
-        """
-        self.id = id
-        self.source = source
-        self.destination = destination
-        self.adapter = adapter
-
-    def compute(self, image):
-        """
-        Performs a vision computation on the image for the Zeus edge.
+    """
+    Represents an edge in the Zeus network.
+    """
+
+    def __init__(self, id, source, destination, adapter, optional=False):
+        """
+        Initializes a Zeus edge.
+
+        Args:
+            id (str): The ID of the Zeus edge.
+            source (ZeusNode): The source node of the edge.
+            destination (ZeusNode): The destination node of the edge.
+            adapter (ZeusProtocol): The adapter for the vision library.
+            optional (bool): Whether the edge is low priority and may be skipped under load.
+        """
+        self.id = id
+        self.source = source
+        self.destination = destination
+        self.adapter = adapter
+        self.optional = optional
+
+    def compute(self, image, out=None):
+        """
+        Performs a vision computation on the image for the Zeus edge.
          Args:
             image (numpy.ndarray): The image to perform the vision computation on.
+            out (numpy.ndarray): An optional buffer to write the result into.
 
         Returns:
             str: The result of the vision computation for the Zeus edge.
         """
-        return self.adapter.process_edge(image)
+        if out is None:
+            return self.adapter.process_edge(image)
+        return self.adapter.process_edge(image, out=out)
+
+    def output_spec(self, image):
+        """
+        Returns the (shape, dtype) of the edge result for the image, or None if unknown.
+        """
+        output_spec = getattr(self.adapter, 'edge_output_spec', None)
+        return output_spec(image) if output_spec is not None else None
 
     def draw(self, image):
         """
@@ -149,30 +306,58 @@ class ZeusProtocol:
     Interface for the Zeus network protocol.
     """
 
-    def process_node(self, image):
+    def process_node(self, image, out=None):
         """
         Perform vision computations for a Zeus node.
 
         Args:
             image (numpy.ndarray): The image to perform the vision computation on.
+            out (numpy.ndarray): An optional buffer, shaped as `node_output_spec`
+                describes, to write the result into.
 
         Returns:
             str: The result of the vision computation.
         """
         raise NotImplementedError
 
-    def process_edge(self, image):
+    def process_edge(self, image, out=None):
         """
         Perform vision computations for a Zeus edge.
 
         Args:
             image (numpy.ndarray): The image to perform the vision computation on.
+            out (numpy.ndarray): An optional buffer, shaped as `edge_output_spec`
+                describes, to write the result into.
 
         Returns:
             str: The result of the vision computation.
         """
         raise NotImplementedError
 
+    def node_output_spec(self, image):
+        """
+        Describe the node result so that a buffer can be leased for it.
+
+        Args:
+            image (numpy.ndarray): The image the node will be computed on.
+
+        Returns:
+            tuple: The (shape, dtype) of the result, or None if the adapter cannot write into a buffer.
+        """
+        return None
+
+    def edge_output_spec(self, image):
+        """
+        Describe the edge result so that a buffer can be leased for it.
+
+        Args:
+            image (numpy.ndarray): The image the edge will be computed on.
+
+        Returns:
+            tuple: The (shape, dtype) of the result, or None if the adapter cannot write into a buffer.
+        """
+        return None
+
     def draw_node(self, image):
         """
         Draw the Zeus node on the image.
@@ -194,16 +379,22 @@ class ZeusProtocol:
 
 # Example adapter for the OpenCV library
 class OpenCVAdapter(ZeusProtocol):
-    def process_node(self, image):
+    def process_node(self, image, out=None):
         # Perform vision computation using OpenCV
-        result = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        result = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=out)
         return result
 
-    def process_edge(self, image):
+    def process_edge(self, image, out=None):
         # Perform vision computation using OpenCV
-        result = cv2.Canny(image, 100, 200)
+        result = cv2.Canny(image, 100, 200, edges=out)
         return result
 
+    def node_output_spec(self, image):
+        return image.shape[:2], np.uint8
+
+    def edge_output_spec(self, image):
+        return image.shape[:2], np.uint8
+
     def draw_node(self, image):
         # Draw the Zeus node using OpenCV
         cv2.circle(image, (50, 50), 10, (0, 0, 255), thickness=-1)
@@ -215,16 +406,23 @@ class OpenCVAdapter(ZeusProtocol):
 
 # Example adapter for the scikit-image library
 class ScikitImageAdapter(ZeusProtocol):
-    def process_node(self, image):
+    def process_node(self, image, out=None):
         # Perform vision computation using scikit-image
-        result = np.mean(image, axis=2)
+        result = np.mean(image, axis=2, out=out)
         return result
 
-    def process_edge(self, image):
+    def process_edge(self, image, out=None):
         # Perform vision computation using scikit-image
         result = skimage.filters.sobel(image)
+        # sobel has no destination argument, so the result can only be copied over
+        if out is not None:
+            np.copyto(out, result)
+            return out
         return result
 
+    def node_output_spec(self, image):
+        return image.shape[:2], np.float64
+
     def draw_node(self, image):
         # Draw the Zeus node using scikit-image
         skimage.draw.circle(image, 50, 50, 10)
@@ -235,29 +433,29 @@ class ScikitImageAdapter(ZeusProtocol):
 
 
 # Usage example
-import numpy as np
-import cv2
-import skimage.draw
-import skimage.filters
-
-# Create the Zeus node graph
-nodes = [
-    ZeusNode("Node1", OpenCVAdapter()),
-    ZeusNode("Node2", ScikitImageAdapter())
-]
-edges = [
-    ZeusEdge("Edge1", nodes[0], nodes[1], OpenCVAdapter())
-]
-graph = ZeusNodeGraph(nodes, edges)
-
-# Load an image
-image = cv2.imread("image.jpg")
-
-# Compute the Zeus node graph
-results = graph.compute(image)
-
-# Print the results
-print(results)
+def main():
+    # Create the Zeus node graph
+    nodes = [
+        ZeusNode("Node1", create_adapter('opencv')),
+        ZeusNode("Node2", create_adapter('scikit-image'))
+    ]
+    edges = [
+        ZeusEdge("Edge1", nodes[0], nodes[1], create_adapter('opencv'))
+    ]
+    graph = ZeusNodeGraph(nodes, edges)
+
+    # Load an image
+    image = cv2.imread("image.jpg")
+
+    # Compute the Zeus node graph
+    results = graph.compute(image)
+
+    # Print the results
+    print(results)
+
+
+if __name__ == '__main__':
+    main()
 
 
 #In this modified  code, we introduce the `ZeusProtocol` interface, which serves as the adapter interface for integrating different vision libraries. The `ZeusNode` and `ZeusEdge` classes now accept an `adapter` parameter, which should be an instance of a class implementing the `ZeusProtocol` interface.
@@ -1,71 +1,73 @@
 
 import numpy as np
-import cv2
 import concurrent.futures
 
+from utils.lazy_import import lazy_import
+
+cv2 = lazy_import('cv2')
+
 class ZeusProtocol:
-    def __init__(self):
-        pass
+    def __init__(self):
+        pass
 
-    def process_image(self, image):
-        pass
+    def process_image(self, image):
+        pass
 
-    def process_node(self, node, image):
-        pass
+    def process_node(self, node, image):
+        pass
 
-    def process_edge(self, edge, image):
-        pass
+    def process_edge(self, edge, image):
+        pass
 
 class ZeusNodeGraph:
-    def __init__(self, nodes, edges):
-        self.nodes = nodes
-        self.edges = edges
+    def __init__(self, nodes, edges):
+        self.nodes = nodes
+        self.edges = edges
 
-    def __repr__(self):
-        return f"ZeusNodeGraph(nodes={self.nodes}, edges={self.edges})"
+    def __repr__(self):
+        return f"ZeusNodeGraph(nodes={self.nodes}, edges={self.edges})"
 
-    def draw(self, image):
-        for node in self.nodes:
-            cv2.circle(image, node.position, node.radius, node.color, thickness=-1)
+    def draw(self, image):
+        for node in self.nodes:
+            cv2.circle(image, node.position, node.radius, node.color, thickness=-1)
 
-        for edge in self.edges:
-            cv2.line(image, edge.source.position, edge.destination.position, edge.color, thickness=2)
+        for edge in self.edges:
+            cv2.line(image, edge.source.position, edge.destination.position, edge.color, thickness=2)
 
-    def compute(self, image, protocol):
-        results = {}
+    def compute(self, image, protocol):
+        results = {}
 
-        with concurrent.futures.ThreadPoolExecutor() as executor:
-            node_futures = {executor.submit(protocol.process_node, node, image): node for node in self.nodes}
-            edge_futures = {executor.submit(protocol.process_edge, edge, image): edge for edge in self.edges}
+        with concurrent.futures.ThreadPoolExecutor() as executor:
+            node_futures = {executor.submit(protocol.process_node, node, image): node for node in self.nodes}
+            edge_futures = {executor.submit(protocol.process_edge, edge, image): edge for edge in self.edges}
 
-            for future in concurrent.futures.as_completed(node_futures):
-                node = node_futures[future]
-                results[node.id] = future.result()
+            for future in concurrent.futures.as_completed(node_futures):
+                node = node_futures[future]
+                results[node.id] = future.result()
 
-            for future in concurrent.futures.as_completed(edge_futures):
-                edge = edge_futures[future]
-                results[edge.id] = future.result()
+            for future in concurrent.futures.as_completed(edge_futures):
+                edge = edge_futures[future]
+                results[edge.id] = future.result()
 
-        return results
+        return results
 
 
 class ZeusNode:
-    def __init__(self, id):
-        self.id = id
+    def __init__(self, id):
+        self.id = id
 
-    def compute(self, image, protocol):
-        return protocol.process_node(self, image)
+    def compute(self, image, protocol):
+        return protocol.process_node(self, image)
 
 
 class ZeusEdge:
-    def __init__(self, id, source, destination):
-        self.id = id
-        self.source = source
-        self.destination = destination
-
-    def compute(self, image, protocol):
-        return protocol.process_edge(self, image)
-```
+    def __init__(self, id, source, destination):
+        self.id = id
+        self.source = source
+        self.destination = destination
+
+    def compute(self, image, protocol):
+        return protocol.process_edge(self, image)
 
 #In the updated code, we introduce the `ZeusProtocol` class as the standardized protocol for vision tasks. It includes the `process_image`, `process_node`, and `process_edge` methods, which will be implemented by specific library integrations.
 